@@ -58,6 +58,11 @@ export default function AdminDashboard() {
             <option value="yearly">Yearly</option>
           </Form.Select>
         </Col>
+        {stats.data_age !== undefined && (
+          <Col md={3} className="d-flex align-items-center text-muted">
+            Updated {Math.round(stats.data_age)}s ago
+          </Col>
+        )}
       </Row>
 
       {/* Users & Blogs Side by Side */}
@@ -11,6 +11,7 @@ export default function BlogDetail() {
 
   const [blog, setBlog] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null);
   const [newComment, setNewComment] = useState("");
 
   // Fetch blog
@@ -26,13 +27,15 @@ export default function BlogDetail() {
     }
   }, [id, token]);
 
-  // Fetch comments
-  const fetchComments = useCallback(async () => {
+  // Fetch comments (newest first, one page at a time)
+  const fetchComments = useCallback(async (cursor = "") => {
     try {
       const res = await API.get(`/blogs/${id}/comments/`, {
+        params: { cursor },
         headers: token ? { Authorization: `Bearer ${token}` } : {},
       });
-      setComments(res.data);
+      setComments((prev) => (cursor ? [...prev, ...res.data.comments] : res.data.comments));
+      setCommentsCursor(res.data.next_cursor);
     } catch (err) {
       console.log(err.response?.data);
       toast.error("Failed to load comments!");
@@ -44,21 +47,21 @@ export default function BlogDetail() {
     fetchComments();
   }, [fetchBlog, fetchComments]);
 
-  // Like blog
+  // Like / unlike blog
   const handleLike = async (blogId) => {
     if (!token) return toast.info("Please login to like posts!");
     try {
-      const res = await API.post(
-        `/blogs/${blogId}/like/`,
-        {},
-        { headers: { Authorization: `Bearer ${token}` } }
-      );
+      const res = await API.request({
+        method: blog.liked ? "delete" : "post",
+        url: `/blogs/${blogId}/like/`,
+        headers: { Authorization: `Bearer ${token}` },
+      });
       setBlog((prevBlog) => ({
         ...prevBlog,
         stats: { ...prevBlog.stats, likes: res.data.likes },
-        liked: true,
+        liked: res.data.liked,
       }));
-      toast.success("You liked this blog!");
+      toast.success(res.data.liked ? "You liked this blog!" : "Like removed");
     } catch (err) {
       if (err.response?.status === 400) toast.info(err.response.data.detail);
       else if (err.response?.status === 403) toast.warn("You cannot like your own blog");
@@ -146,7 +149,7 @@ export default function BlogDetail() {
           <div className="d-flex gap-3">
             <Button
               variant={blog.liked ? "success" : "outline-primary"}
-              disabled={!token || blog.liked}
+              disabled={!token}
               onClick={() => handleLike(blog.id)}
             >
               {token ? (blog.liked ? "Liked ❤️" : "Like 👍") : "Login to Like"}
@@ -207,6 +210,12 @@ export default function BlogDetail() {
             ))}
           </ListGroup>
 
+          {commentsCursor && (
+            <Button variant="link" className="mb-3" onClick={() => fetchComments(commentsCursor)}>
+              Load more comments
+            </Button>
+          )}
+
           {token ? (
             <Form onSubmit={handleCommentSubmit}>
               <Form.Group className="mb-2">
@@ -0,0 +1,81 @@
+from asgiref.sync import sync_to_async
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from . import reads, views
+from .authentication import CachedJWTAuthentication
+
+# ! Native async GET handlers (BLOG_ASYNC_VIEWS, served through blogging/asgi.py)
+# GETs of the read-heavy endpoints run the same readers as blog/views.py
+# (blog/reads.py), driven by the async ORM on the event loop; every other method
+# is handed to the @api_view functions. Responses are JSON only.
+authentication = CachedJWTAuthentication()
+
+
+# Rendered here with DRF's JSON renderer (pure CPU), so the bytes match the
+# sync views and the handler has nothing left to render. 304s pass through.
+def _render(response):
+    if not isinstance(response, Response):
+        return response
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = JSONRenderer.media_type
+    response.renderer_context = {}
+    return response.render()
+
+
+# A DRF Request (query_params, serializer context) carrying the JWT user, or
+# the 401 DRF would have answered with
+async def _api_request(request):
+    api_request = Request(request, authenticators=[])
+    try:
+        authenticated = await authentication.aauthenticate(request)
+    except APIException as e:
+        response = _render(Response(e.detail if isinstance(e.detail, (list, dict)) else {'detail': e.detail}, e.status_code))
+        response['WWW-Authenticate'] = authentication.authenticate_header(request)
+        return None, response
+    if authenticated is not None:
+        api_request.user, api_request.auth = authenticated
+    return api_request, None
+
+
+def _async_get(view, reader):
+    async def async_view(request, **kwargs):
+        if request.method != 'GET':
+            return await sync_to_async(view)(request, **kwargs)
+        # DRF authenticates every request up front, so a bad token is a 401 here too
+        api_request, error = await _api_request(request)
+        if error:
+            return error
+        return _render(await reads.arun(reader(api_request, **kwargs)))
+
+    async_view.sync_view = view
+    return csrf_exempt(async_view)
+
+
+blogs_list_create = _async_get(views.blogs_list_create, reads.blog_list)
+blog_detail = _async_get(views.blog_detail, reads.blog_detail)
+blog_comments = _async_get(views.blog_comments, reads.blog_comments)
+categories_list_create = _async_get(views.categories_list_create, reads.category_list)
+
+ASYNC_VIEWS = {
+    'blogs-list-create': blogs_list_create,
+    'blog-detail': blog_detail,
+    'blog-comments': blog_comments,
+    'categories-list-create': categories_list_create,
+}
+
+
+# `patterns` with the read-heavy routes served by the async views above
+# (use_async=False swaps them back, e.g. for benchmark_concurrency)
+def with_async_views(patterns, use_async=True):
+    swapped = []
+    for pattern in patterns:
+        view = ASYNC_VIEWS.get(pattern.name)
+        if view is not None:
+            pattern = path(str(pattern.pattern), view if use_async else view.sync_view, name=pattern.name)
+        swapped.append(pattern)
+    return swapped
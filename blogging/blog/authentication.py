@@ -0,0 +1,106 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# ! JWT authentication with a cached user lookup
+# The user behind a token is cached for JWT_USER_CACHE_TIMEOUT seconds as
+# (version, user). Every User save or delete bumps the user's version, so a
+# stale copy is never served again, even one written by a request that loaded
+# the user just before the save. Entry and version are read in one round trip.
+# QuerySet.update() skips the signals; call forget_cached_user() after those.
+
+
+def _cache():
+    return caches[settings.JWT_USER_CACHE_ALIAS]
+
+
+def _keys(user_id):
+    return f'auth-user:{user_id}', f'auth-user:{user_id}:version'
+
+
+def forget_cached_user(user_id):
+    cache = _cache()
+    _, version_key = _keys(user_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # Seeded from the clock so an evicted version never matches old entries
+        cache.set(version_key, int(time.time() * 1000), None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        cache = _cache()
+        entry_key, version_key = _keys(user_id)
+        cached = cache.get_many([entry_key, version_key])
+        version = cached.get(version_key)
+        entry = cached.get(entry_key)
+        if entry is not None and version is not None and entry[0] == version:
+            user = entry[1]
+            self.check_user(user, validated_token)
+            return user
+
+        if version is None:
+            version = int(time.time() * 1000)
+            if not cache.add(version_key, version, None):
+                version = cache.get(version_key, version)
+        user = super().get_user(validated_token)
+        cache.set(entry_key, (version, user), settings.JWT_USER_CACHE_TIMEOUT)
+        return user
+
+    # get_user() / authenticate() for the async views (blog/async_views.py)
+    async def aget_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        cache = _cache()
+        entry_key, version_key = _keys(user_id)
+        cached = await cache.aget_many([entry_key, version_key])
+        version = cached.get(version_key)
+        entry = cached.get(entry_key)
+        if entry is not None and version is not None and entry[0] == version:
+            user = entry[1]
+            self.check_user(user, validated_token)
+            return user
+
+        if version is None:
+            version = int(time.time() * 1000)
+            if not await cache.aadd(version_key, version, None):
+                version = await cache.aget(version_key, version)
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        self.check_user(user, validated_token)
+        await cache.aset(entry_key, (version, user), settings.JWT_USER_CACHE_TIMEOUT)
+        return user
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    # The checks JWTAuthentication.get_user makes after its query
+    def check_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
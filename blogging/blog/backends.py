@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+
+User = get_user_model()
+
+
+# ! Login by username or email
+# The identifier is resolved with one query on the two unique (indexed) columns
+# and the password is hashed exactly once per attempt. Unknown identifiers
+# still pay one hash, so response time does not reveal which accounts exist.
+class UsernameOrEmailBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None or password is None:
+            return None
+        # Another account's email can equal a username; the username wins
+        candidates = list(User._default_manager.filter(Q(username=username) | Q(email=username))[:2])
+        candidates.sort(key=lambda user: user.username != username)
+        if not candidates:
+            User().set_password(password)
+            return None
+        user = candidates[0]
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,127 @@
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidate_blog_list_cache
+from .models import Blog, BlogStats, Category
+from .search import index_blogs
+from .serializers import BlogSerializer
+
+# ! Batch create / update / delete
+# Every operation is validated against one locked lookup of the blogs it names
+# and one lookup of the categories involved. Nothing is written unless all of
+# them pass; then the whole batch is one bulk_create, one bulk_update and one
+# BlogStats bulk_create, followed by a single search index and cache update.
+OPERATIONS = ('create', 'update', 'delete')
+UPDATE_FIELDS = ['title', 'content', 'category', 'image', 'is_published', 'publish_at', 'deleted_at', 'updated_at']
+
+
+def _target_id(operation):
+    if isinstance(operation, dict) and operation.get('op') in ('update', 'delete'):
+        return operation.get('id')
+    return None
+
+
+def _category_name(operation):
+    data = operation.get('data') if isinstance(operation, dict) else None
+    return data.get('category_name') if isinstance(data, dict) else None
+
+
+# Returns (blog, errors) for one operation, without touching the database
+def _prepare(user, operation, targets, categories, seen, now):
+    if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+        return None, {'op': [f"Must be one of: {', '.join(OPERATIONS)}."]}
+    context = {'categories': categories}
+
+    if operation['op'] == 'create':
+        serializer = BlogSerializer(data=operation.get('data'), context=context)
+        if not serializer.is_valid():
+            return None, serializer.errors
+        data = dict(serializer.validated_data)
+        blog = Blog(author=user, category=data.pop('category_name'), **data)
+        blog.sync_publish_state()
+        return blog, None
+
+    blog = targets.get(operation.get('id'))
+    if blog is None:
+        return None, {'id': ['Blog not found.']}
+    if blog.pk in seen:
+        return None, {'id': ['Blog appears more than once in this batch.']}
+    seen.add(blog.pk)
+    if blog.author_id != user.id and not user.is_admin:
+        return None, {'detail': 'Permission denied'}
+
+    if operation['op'] == 'delete':
+        blog.deleted_at = now
+        return blog, None
+
+    serializer = BlogSerializer(blog, data=operation.get('data'), partial=True, context=context)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    data = dict(serializer.validated_data)
+    category = data.pop('category_name', None)
+    if category:
+        blog.category = category
+    for attr, value in data.items():
+        setattr(blog, attr, value)
+    blog.sync_publish_state()
+    return blog, None
+
+
+def apply_blog_batch(user, operations):
+    now = timezone.now()
+    with transaction.atomic():
+        ids = [pk for pk in map(_target_id, operations) if isinstance(pk, int)]
+        targets = Blog.objects.alive().select_for_update().in_bulk(ids)
+        names = {name for name in map(_category_name, operations) if isinstance(name, str)}
+        loaded = Category.objects.filter(
+            Q(name__in=names) | Q(id__in={blog.category_id for blog in targets.values()})
+        )
+        by_id = {category.id: category for category in loaded}
+        for blog in targets.values():
+            if blog.category_id:
+                blog.category = by_id[blog.category_id]
+        categories = {category.name: category for category in loaded}
+
+        results, created, changed, seen, failed = [], [], [], set(), False
+        for index, operation in enumerate(operations):
+            blog, errors = _prepare(user, operation, targets, categories, seen, now)
+            op = operation.get('op') if isinstance(operation, dict) else None
+            if errors:
+                failed = True
+                results.append({'index': index, 'op': op, 'status': 'error', 'errors': errors})
+                continue
+            (created if op == 'create' else changed).append(blog)
+            results.append({'index': index, 'op': op, 'blog': blog})
+
+        if failed:
+            for result in results:
+                blog = result.pop('blog', None)
+                if blog is not None:
+                    result.update(id=blog.pk, status='skipped')
+            return results, False
+
+        if created:
+            # One shared stamp lets the rows be found again where the database
+            # cannot return primary keys from a bulk insert (MySQL)
+            for blog in created:
+                blog.created_at = now
+            Blog.objects.bulk_create(created)
+            if not connection.features.can_return_rows_from_bulk_insert:
+                pks = Blog.objects.filter(author=user, created_at=now).order_by('id').values_list('id', flat=True)
+                for blog, pk in zip(created, pks):
+                    blog.pk = pk
+            BlogStats.objects.bulk_create([BlogStats(blog=blog) for blog in created])
+        if changed:
+            # bulk_update skips auto_now
+            for blog in changed:
+                blog.updated_at = now
+            Blog.objects.bulk_update(changed, UPDATE_FIELDS)
+        index_blogs(created + changed)
+
+    invalidate_blog_list_cache()
+    statuses = {'create': 'created', 'update': 'updated', 'delete': 'deleted'}
+    for result in results:
+        blog = result.pop('blog')
+        result.update(id=blog.pk, status=statuses[result['op']])
+    return results, True
@@ -0,0 +1,142 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+# ! Anonymous blog list cache
+# Entries are keyed on a generation number plus the normalized query string.
+# Any write that can change a list bumps the generation, which orphans every
+# cached page at once; orphans simply expire through the cache TTL.
+GENERATION_KEY = 'blog-list:generation'
+HITS_KEY = 'blog-list:hits'
+MISSES_KEY = 'blog-list:misses'
+
+
+def _cache():
+    return caches[settings.BLOG_LIST_CACHE_ALIAS]
+
+
+def _incr(key):
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing (first use or evicted): start counting again
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def _generation():
+    # Seeded from the clock so an evicted generation never reuses old keys
+    return _cache().get_or_set(GENERATION_KEY, int(time.time() * 1000), None)
+
+
+def normalize_list_params(params):
+    normalized = {
+        'search': ' '.join(params.get('search', '').lower().split()),
+        'category': params.get('category', '').strip().lower(),
+        'sort': params.get('sort') or 'newest',
+        'page': params.get('page') or '1',
+        'page_size': params.get('page_size') or '10',
+    }
+    for name in ('fields', 'omit'):
+        if params.get(name):
+            normalized[name] = ','.join(sorted(n.strip() for n in params[name].split(',') if n.strip()))
+    for name in ('page', 'page_size'):
+        if normalized[name].isdigit():
+            normalized[name] = str(int(normalized[name]))
+    # Cursor mode returns a different response shape
+    if 'cursor' in params:
+        normalized['cursor'] = params.get('cursor')
+        normalized['with_total'] = params.get('with_total') == 'true'
+    return normalized
+
+
+def blog_list_cache_key(params):
+    query = urlencode(sorted(normalize_list_params(params).items()))
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f'blog-list:{_generation()}:{digest}'
+
+
+# Entries are (data, etag) so hits can also answer conditional GETs
+def get_cached_blog_list(key):
+    entry = _cache().get(key)
+    _incr(HITS_KEY if entry is not None else MISSES_KEY)
+    return entry
+
+
+def cache_blog_list(key, entry):
+    _cache().set(key, entry, settings.BLOG_LIST_CACHE_TIMEOUT)
+
+
+def invalidate_blog_list_cache():
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, int(time.time() * 1000), None)
+
+
+def blog_list_cache_stats():
+    hits, misses = (_cache().get(key, 0) for key in (HITS_KEY, MISSES_KEY))
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+# ! Admin dashboard cache (stale-while-revalidate)
+# Entries are (data, computed_at) kept for TIMEOUT + STALE seconds. Within
+# TIMEOUT they are served as is; after that the first request to win the lock
+# recomputes while every other request keeps getting the stale copy without
+# waiting. Only on a cold miss do the others wait for the lock holder's result,
+# for at most ADMIN_STATS_CACHE_WAIT seconds before computing it themselves, so
+# a burst of dashboard loads usually costs one set of aggregates.
+ADMIN_STATS_KEY = 'admin-stats:{}'
+ADMIN_STATS_LOCK_KEY = 'admin-stats:{}:lock'
+ADMIN_STATS_POLL_INTERVAL = 0.05
+
+
+def _store_admin_stats(range_type, compute):
+    entry = (compute(), time.time())
+    _cache().set(ADMIN_STATS_KEY.format(range_type), entry,
+                 settings.ADMIN_STATS_CACHE_TIMEOUT + settings.ADMIN_STATS_CACHE_STALE)
+    return entry
+
+
+def _single_flight(range_type, compute):
+    cache = _cache()
+    lock_key = ADMIN_STATS_LOCK_KEY.format(range_type)
+    if not cache.add(lock_key, 1, settings.ADMIN_STATS_CACHE_LOCK_TIMEOUT):
+        return None
+    try:
+        return _store_admin_stats(range_type, compute)
+    finally:
+        cache.delete(lock_key)
+
+
+# (data, age in seconds) for one range of the admin dashboard
+def cached_admin_stats(range_type, compute):
+    cache = _cache()
+    key = ADMIN_STATS_KEY.format(range_type)
+    entry = cache.get(key)
+
+    if entry is None:
+        entry = _single_flight(range_type, compute)
+        # Someone else is computing and there is nothing to serve meanwhile:
+        # wait briefly for their result
+        deadline = time.monotonic() + settings.ADMIN_STATS_CACHE_WAIT
+        while entry is None and time.monotonic() < deadline:
+            time.sleep(ADMIN_STATS_POLL_INTERVAL)
+            entry = cache.get(key)
+        if entry is None:
+            entry = _store_admin_stats(range_type, compute)
+    elif time.time() - entry[1] >= settings.ADMIN_STATS_CACHE_TIMEOUT:
+        entry = _single_flight(range_type, compute) or entry
+
+    data, computed_at = entry
+    return data, max(time.time() - computed_at, 0)
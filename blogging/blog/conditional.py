@@ -0,0 +1,78 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from .models import Blog
+
+# ! Conditional GET (ETag)
+# Validators are derived from cheap columns so a matching If-None-Match is
+# answered with a 304 before any serializer runs. There is deliberately no
+# Last-Modified: likes, shares and the viewer's liked state carry no
+# timestamp, so a date could not tell when they changed and If-Modified-Since
+# would serve stale counters.
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _viewer(user):
+    # current_user / is_admin / liked in the payload depend on who is asking
+    if user.is_authenticated:
+        return (user.pk, user.is_staff)
+    return None
+
+
+def _selection(selection):
+    # ?fields= / ?omit= change the representation
+    return sorted((key, sorted(names)) for key, names in (selection or {}).items())
+
+
+# liked_ids: ids the viewer has liked among the blogs checked, None when the
+# representation has no `liked`
+def _liked(blog, liked_ids):
+    return None if liked_ids is None else blog.pk in liked_ids
+
+
+# sharded: sharded_totals() of the blogs checked, so increments still held in
+# BlogStatsShard rows change the validator too
+def _counters(blog, stats, fields, sharded):
+    if stats is None:
+        return None
+    deltas = (sharded or {}).get(blog.pk, {})
+    return tuple(getattr(stats, field) + deltas.get(field, 0) for field in fields)
+
+
+def blog_detail_validators(blog, user, selection=None, liked_ids=None, sharded=None):
+    # Expects Blog.objects.for_detail(); views are left out because every GET
+    # bumps them, which would defeat the validator
+    counters = _counters(blog, getattr(blog, 'stats', None), ('likes', 'shares'), sharded)
+    return make_etag(
+        'blog', blog.pk, blog.updated_at, counters, blog.comment_count,
+        blog.last_comment_at, _liked(blog, liked_ids), _viewer(user), _selection(selection),
+    )
+
+
+def blog_list_validators(blogs, meta, user, selection=None, liked_ids=None, sharded=None):
+    rows = []
+    for blog in blogs:
+        # Only read what the page query loaded; never trigger a lazy load here
+        stats = blog.stats if Blog.stats.is_cached(blog) else None
+        counters = _counters(blog, stats, ('views', 'likes', 'shares'), sharded)
+        rows.append((
+            blog.pk, blog.updated_at, counters, getattr(blog, 'comment_count', None), _liked(blog, liked_ids),
+        ))
+    return make_etag('blogs', sorted(meta.items()), rows, _viewer(user), _selection(selection))
+
+
+def conditional_response(request, etag):
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_validators(response, etag)
+    return response
+
+
+def set_validators(response, etag):
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Authorization'])
+    return response
@@ -0,0 +1,221 @@
+import atexit
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+
+from .engagement import record_engagement
+from .models import Blog, BlogStats, BlogStatsShard
+
+logger = logging.getLogger(__name__)
+
+# ! Counter writes
+# With BLOG_COUNTER_SHARDS > 1 every write goes to one randomly chosen
+# BlogStatsShard row per call instead of the blog's BlogStats row, so
+# concurrent increments of one hot post rarely wait on the same row lock.
+# Reads add sharded_totals() until compact_shards() folds the shards back.
+# Once the write commits, it is also added to the hourly engagement history, in
+# its own short transaction and in the bucket of the same shard, so the history
+# adds no lock to the counter transaction and no hot row of its own.
+COUNTER_FIELDS = ('views', 'likes', 'shares')
+
+
+# Add {blog_id: delta} to one counter, one UPDATE ... SET field = field + n per
+# distinct n, creating the rows that do not exist yet
+def add_to_counters(field, deltas, shards=None):
+    shards = settings.BLOG_COUNTER_SHARDS if shards is None else shards
+    shard = random.randrange(shards) if shards > 1 else 0
+    if shards > 1:
+        model, lookup = BlogStatsShard, {'shard': shard}
+    else:
+        model, lookup = BlogStats, {}
+
+    def record(counted):
+        # robust: a failed history write is logged, the counter write stands
+        transaction.on_commit(partial(record_engagement, field, counted, shard=shard), robust=True)
+
+    by_delta = defaultdict(list)
+    for blog_id, delta in deltas.items():
+        by_delta[delta].append(blog_id)
+
+    with transaction.atomic():
+        updated = 0
+        for delta, blog_ids in by_delta.items():
+            rows = model.objects.filter(blog_id__in=blog_ids, **lookup)
+            if delta < 0 and model is BlogStats:
+                # BlogStats counters are unsigned
+                rows = rows.filter(**{f'{field}__gte': -delta})
+            updated += rows.update(**{field: F(field) + delta})
+        if updated == len(deltas):
+            record(deltas)
+            return
+
+        # Blogs without a row yet (skipping any deleted since)
+        existing = set(model.objects.filter(blog_id__in=deltas, **lookup).values_list('blog_id', flat=True))
+        missing = list(Blog.objects.filter(id__in=[pk for pk in deltas if pk not in existing]).values_list('id', flat=True))
+        record({pk: deltas[pk] for pk in [*existing, *missing]})
+        if model is BlogStats:
+            missing = [pk for pk in missing if deltas[pk] > 0]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([model(blog_id=pk, **lookup, **{field: deltas[pk]}) for pk in missing])
+        except IntegrityError:
+            # Created concurrently in the meantime, so they can be updated now
+            for pk in missing:
+                model.objects.filter(blog_id=pk, **lookup).update(**{field: F(field) + deltas[pk]})
+
+
+def increment_counter(blog_id, field, delta=1):
+    add_to_counters(field, {blog_id: delta})
+
+
+# Deltas still held by shards, {blog_id: {field: n}}; empty when sharding is off
+def sharded_totals(blog_ids):
+    if settings.BLOG_COUNTER_SHARDS <= 1:
+        return {}
+    rows = (
+        BlogStatsShard.objects.filter(blog_id__in=blog_ids).order_by().values('blog_id')
+        .annotate(**{field: Sum(field) for field in COUNTER_FIELDS})
+    )
+    return {row.pop('blog_id'): row for row in rows}
+
+
+async def asharded_totals(blog_ids):
+    if settings.BLOG_COUNTER_SHARDS <= 1:
+        return {}
+    rows = (
+        BlogStatsShard.objects.filter(blog_id__in=blog_ids).order_by().values('blog_id')
+        .annotate(**{field: Sum(field) for field in COUNTER_FIELDS})
+    )
+    return {row.pop('blog_id'): row async for row in rows}
+
+
+def counter_value(stats, blog_id, field):
+    stored = getattr(stats, field) if stats else 0
+    return stored + sharded_totals([blog_id]).get(blog_id, {}).get(field, 0)
+
+
+# Fold shard deltas into BlogStats chunk by chunk (only those of blog_ids when
+# given). Shard rows are locked while they are added and zeroed, so increments
+# landing meanwhile wait instead of being lost.
+def compact_shards(chunk_size=1000, blog_ids=None):
+    shards = BlogStatsShard.objects.all() if blog_ids is None else BlogStatsShard.objects.filter(blog_id__in=blog_ids)
+    compacted, last_id = 0, 0
+    while True:
+        with transaction.atomic():
+            chunk = list(shards.select_for_update().filter(id__gt=last_id).order_by('id')[:chunk_size])
+            if not chunk:
+                break
+            totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+            for shard in chunk:
+                for field in COUNTER_FIELDS:
+                    totals[shard.blog_id][field] += getattr(shard, field)
+            for blog_id, deltas in totals.items():
+                if any(deltas.values()):
+                    stats, _ = BlogStats.objects.get_or_create(blog_id=blog_id)
+                    BlogStats.objects.filter(pk=stats.pk).update(
+                        **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+                    )
+                    compacted += 1
+            BlogStatsShard.objects.filter(id__in=[shard.id for shard in chunk]).update(
+                **dict.fromkeys(COUNTER_FIELDS, 0)
+            )
+            last_id = chunk[-1].id
+    return compacted
+
+
+# ! Buffered (write-behind) view counter
+# Detail views are counted in memory and written back every
+# BLOG_VIEW_FLUSH_INTERVAL seconds as one UPDATE ... SET views = views + n per
+# distinct n, instead of a row write per request. The writes happen on a daemon
+# thread started with the first view (again in a forked worker), so an idle
+# worker flushes too and requests never wait on them. A flush swaps the buffer
+# out before writing and merges it back if the write fails, so an increment is
+# never applied twice; failures are logged and retried on the next tick. What
+# is pending at exit is flushed then; a killed worker loses at most one
+# interval of views.
+class ViewCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._flushing = {}
+        self._flusher = None
+
+    # True when views are written straight through (interval 0)
+    def _count(self, blog_id):
+        with self._lock:
+            self._pending[blog_id] += 1
+        return settings.BLOG_VIEW_FLUSH_INTERVAL <= 0
+
+    def _start_flusher(self):
+        flusher = self._flusher
+        if flusher is not None and flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_periodically, name='view-counter', daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(max(settings.BLOG_VIEW_FLUSH_INTERVAL, 1))
+            try:
+                self.flush()
+            finally:
+                # No connection is held between ticks
+                connection.close()
+
+    def record(self, blog_id):
+        if self._count(blog_id):
+            self.flush()
+        else:
+            self._start_flusher()
+
+    async def arecord(self, blog_id):
+        if self._count(blog_id):
+            await sync_to_async(self.flush)()
+        else:
+            self._start_flusher()
+
+    # Views counted but not yet in the database
+    def pending(self, blog_id):
+        with self._lock:
+            return self._pending.get(blog_id, 0) + self._flushing.get(blog_id, 0)
+
+    # Views written; 0 when nothing was pending or the write failed
+    def flush(self):
+        # Another thread is already writing; its next flush picks these up
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                self._flushing, self._pending = self._pending, defaultdict(int)
+            if not self._flushing:
+                return 0
+            try:
+                add_to_counters('views', self._flushing)
+            except Exception:
+                with self._lock:
+                    for blog_id, delta in self._flushing.items():
+                        self._pending[blog_id] += delta
+                logger.exception("Could not flush %d buffered views, keeping them for the next flush",
+                                 sum(self._flushing.values()))
+                return 0
+            return sum(self._flushing.values())
+        finally:
+            with self._lock:
+                self._flushing = {}
+            self._flush_lock.release()
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
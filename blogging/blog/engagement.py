@@ -0,0 +1,124 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import BlogEngagementBucket
+
+# ! Engagement history
+# Committed counter writes add to one BlogEngagementBucket row per (blog,
+# event, hour, counter shard), created by the first write of the hour, so the
+# hourly table grows with active blog-hours rather than with traffic and a hot
+# post's history is spread over as many rows as its counters.
+# compact_engagement() sums hourly rows older than BLOG_ENGAGEMENT_HOURLY_DAYS
+# into one daily row and daily rows older than BLOG_ENGAGEMENT_DAILY_DAYS into
+# one monthly row, which keeps the table bounded per blog. Older history is
+# therefore only available at the coarser resolution.
+HOUR, DAY, MONTH = 'hour', 'day', 'month'
+
+
+def _hour_start(moment):
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def _day_start(moment):
+    return timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _month_start(moment):
+    return _day_start(moment).replace(day=1)
+
+
+# Add {(blog_id, event, bucket_start): delta} to the `granularity` buckets of
+# `shard`: one UPDATE ... SET count = count + n per distinct (event, start, n),
+# then one INSERT for the buckets that do not exist yet
+def _add_to_buckets(granularity, deltas, shard=0):
+    by_delta = defaultdict(list)
+    for (blog_id, event, start), delta in deltas.items():
+        if delta:
+            by_delta[(event, start, delta)].append(blog_id)
+
+    missing = []
+    for (event, start, delta), blog_ids in by_delta.items():
+        rows = BlogEngagementBucket.objects.filter(
+            blog_id__in=blog_ids, event=event, granularity=granularity, bucket_start=start, shard=shard,
+        )
+        if rows.update(count=F('count') + delta) < len(blog_ids):
+            existing = set(rows.values_list('blog_id', flat=True))
+            missing += [
+                BlogEngagementBucket(
+                    blog_id=pk, event=event, granularity=granularity, bucket_start=start, shard=shard, count=delta,
+                )
+                for pk in blog_ids if pk not in existing
+            ]
+    if not missing:
+        return
+    try:
+        with transaction.atomic():
+            BlogEngagementBucket.objects.bulk_create(missing)
+    except IntegrityError:
+        # Created concurrently in the meantime, so they can be updated now
+        for row in missing:
+            BlogEngagementBucket.objects.filter(
+                blog_id=row.blog_id, event=row.event, granularity=granularity, bucket_start=row.bucket_start, shard=shard,
+            ).update(count=F('count') + row.count)
+
+
+# Add {blog_id: delta} for one event to the current hour's buckets of `shard`
+def record_engagement(event, deltas, now=None, shard=0):
+    bucket_start = _hour_start(now or timezone.now())
+    _add_to_buckets(HOUR, {(blog_id, event, bucket_start): delta for blog_id, delta in deltas.items()}, shard)
+
+
+# Fold `source` rows starting before `cutoff`, of every shard, into the one
+# `target` bucket of their `bucket_of` period. Rows are locked chunk by chunk so two compactions never
+# sum the same rows.
+def _compact(source, target, bucket_of, cutoff, chunk_size):
+    compacted = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                BlogEngagementBucket.objects.select_for_update()
+                .filter(granularity=source, bucket_start__lt=cutoff).order_by('id')[:chunk_size]
+            )
+            if not chunk:
+                break
+            sums = defaultdict(int)
+            for row in chunk:
+                sums[(row.blog_id, row.event, bucket_of(row.bucket_start))] += row.count
+            _add_to_buckets(target, sums)
+            BlogEngagementBucket.objects.filter(id__in=[row.id for row in chunk]).delete()
+        compacted += len(chunk)
+    return compacted
+
+
+# Cutoffs fall on day / month boundaries so compacted periods are complete
+def compact_engagement(now=None, chunk_size=1000):
+    now = now or timezone.now()
+    day_cutoff = _day_start(now - datetime.timedelta(days=settings.BLOG_ENGAGEMENT_HOURLY_DAYS))
+    month_cutoff = _month_start(now - datetime.timedelta(days=settings.BLOG_ENGAGEMENT_DAILY_DAYS))
+    return (
+        _compact(HOUR, DAY, _day_start, day_cutoff, chunk_size)
+        + _compact(DAY, MONTH, _month_start, month_cutoff, chunk_size)
+    )
+
+
+# [{period, views, likes, shares}] per `truncate_func` period, oldest first
+def engagement_series(blog_id, truncate_func, since=None, until=None):
+    rows = BlogEngagementBucket.objects.filter(blog_id=blog_id)
+    if since:
+        rows = rows.filter(bucket_start__gte=since)
+    if until:
+        rows = rows.filter(bucket_start__lt=until)
+    rows = (
+        rows.annotate(period=truncate_func('bucket_start'))
+        .values('period', 'event').annotate(count=Sum('count')).order_by('period')
+    )
+    series = {}
+    for row in rows:
+        point = series.setdefault(row['period'], dict.fromkeys(BlogEngagementBucket.EVENTS, 0))
+        point[row['event']] += row['count']
+    return [{"period": period.strftime("%Y-%m-%d"), **counts} for period, counts in series.items()]
@@ -0,0 +1,112 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Sum
+
+from .models import Blog, Category, DailyBlogStats, DailyCategoryStats, DailySiteStats
+
+# ! Streaming stats export (GET /api/stats/export/<dataset>.<format>)
+# Rows are produced per ?range= period from the daily rollups and written out
+# as they are read. Blogs and categories are walked in keyset chunks of
+# STATS_EXPORT_CHUNK_SIZE ids with one grouped query per chunk, because the
+# MySQL driver buffers a whole result set even under .iterator(); memory stays
+# bounded by the chunk, not the table.
+COUNTERS = ('views', 'likes', 'shares')
+
+
+def _period(row):
+    row['period'] = row['period'].strftime('%Y-%m-%d')
+    return row
+
+
+# Values of `owners` in id order, `chunk_size` at a time
+def _owner_chunks(owners, fields, chunk_size):
+    last_id = 0
+    while True:
+        chunk = list(owners.filter(id__gt=last_id).order_by('id').values(*fields)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]['id']
+
+
+# One row per owner and period with activity; owners without any rollup row
+# (nothing counted yet) still get one row, with no period and zero counts
+def _per_owner(owners, fields, rollups, owner_field, truncate_func):
+    chunk_size = settings.STATS_EXPORT_CHUNK_SIZE
+    idle = {'period': None, **dict.fromkeys(COUNTERS, 0)}
+    for chunk in _owner_chunks(owners, fields, chunk_size):
+        by_id = {owner['id']: owner for owner in chunk}
+        rows = (
+            rollups.filter(**{f'{owner_field}__in': by_id})
+            .annotate(period=truncate_func('date')).values(owner_field, 'period')
+            .annotate(**{field: Sum(field) for field in COUNTERS}).order_by(owner_field, 'period')
+        )
+        # Both are in id order, so the owners without rows are the ones skipped
+        remaining = iter(chunk)
+        current = None
+        for row in rows.iterator(chunk_size=chunk_size):
+            owner_id = row.pop(owner_field)
+            while current != owner_id:
+                owner = next(remaining)
+                current = owner['id']
+                if current != owner_id:
+                    yield {**owner, **idle}
+            yield _period({**by_id[owner_id], **row})
+        for owner in remaining:
+            yield {**owner, **idle}
+
+
+def blog_rows(truncate_func):
+    owners = Blog.objects.alive().annotate(author_name=F('author__username'), category_name=F('category__name'))
+    return _per_owner(
+        owners, ['id', 'title', 'author_name', 'category_name'], DailyBlogStats.objects.all(), 'blog_id', truncate_func
+    )
+
+
+def category_rows(truncate_func):
+    return _per_owner(Category.objects.all(), ['id', 'name'], DailyCategoryStats.objects.all(), 'category_id', truncate_func)
+
+
+def signup_rows(truncate_func):
+    rows = (
+        DailySiteStats.objects.annotate(period=truncate_func('date')).values('period')
+        .annotate(signups=Sum('signups'), blogs_created=Sum('blogs_created'), publications=Sum('publications'))
+        .order_by('period')
+    )
+    return (_period(row) for row in rows.iterator(chunk_size=settings.STATS_EXPORT_CHUNK_SIZE))
+
+
+# dataset -> (columns, rows(truncate_func))
+EXPORT_DATASETS = {
+    'blogs': (['id', 'title', 'author_name', 'category_name', 'period', *COUNTERS], blog_rows),
+    'categories': (['id', 'name', 'period', *COUNTERS], category_rows),
+    'signups': (['period', 'signups', 'blogs_created', 'publications'], signup_rows),
+}
+
+
+# csv.writer only needs an object with write(); return each line instead
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+def ndjson_lines(columns, rows):
+    for row in rows:
+        yield json.dumps({column: row[column] for column in columns}, cls=DjangoJSONEncoder) + '\n'
+
+
+# format -> (content type, line generator)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', csv_lines),
+    'ndjson': ('application/x-ndjson', ndjson_lines),
+}
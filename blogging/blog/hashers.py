@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, must_update_salt
+from django.core.exceptions import ImproperlyConfigured
+
+# Lowest PASSWORD_HASH_ITERATIONS accepted unless PASSWORD_HASH_ALLOW_WEAK is
+# set (OWASP's figure for PBKDF2-HMAC-SHA256)
+MIN_ITERATIONS = 600_000
+
+
+# ! PBKDF2 with a configurable work factor (PASSWORD_HASH_ITERATIONS)
+# Same algorithm name as Django's hasher, so existing hashes verify as is. A
+# hash is re-encoded on the next successful login only when it is cheaper than
+# the configured cost: lowering the setting never weakens stored hashes.
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        iterations = settings.PASSWORD_HASH_ITERATIONS
+        if iterations < MIN_ITERATIONS and not settings.PASSWORD_HASH_ALLOW_WEAK:
+            raise ImproperlyConfigured(
+                f"PASSWORD_HASH_ITERATIONS={iterations} is below {MIN_ITERATIONS}; "
+                "set PASSWORD_HASH_ALLOW_WEAK=True to use it (load tests only)."
+            )
+        return iterations
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return decoded['iterations'] < self.iterations or must_update_salt(decoded['salt'], self.salt_entropy)
@@ -0,0 +1,92 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+
+from .counters import increment_counter
+from .models import BlogStats, BlogStatsShard
+
+# ! Likes
+# Membership lives in BlogStats.liked_users and BlogStats.likes is its count.
+# A like is one insert into the through table, made conditional by its unique
+# (blogstats, user) pair, followed by a counter increment (add_to_counters)
+# only when the row went in. Concurrent or repeated likes therefore never lose
+# or double count.
+LikeMembership = BlogStats.liked_users.through
+
+
+def like_blog(stats, user):
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                LikeMembership.objects.create(blogstats_id=stats.pk, user_id=user.pk)
+        except IntegrityError:
+            return False
+        increment_counter(stats.blog_id, 'likes')
+    return True
+
+
+def unlike_blog(stats, user):
+    with transaction.atomic():
+        removed, _ = LikeMembership.objects.filter(blogstats_id=stats.pk, user_id=user.pk).delete()
+        if removed:
+            increment_counter(stats.blog_id, 'likes', -1)
+    return bool(removed)
+
+
+# Ids of the given blogs the user has liked, in one query
+def liked_blog_ids(user, blog_ids):
+    if not user.is_authenticated:
+        return set()
+    return set(
+        LikeMembership.objects.filter(user_id=user.pk, blogstats__blog_id__in=blog_ids)
+        .values_list('blogstats__blog_id', flat=True)
+    )
+
+
+async def aliked_blog_ids(user, blog_ids):
+    if not user.is_authenticated:
+        return set()
+    rows = (
+        LikeMembership.objects.filter(user_id=user.pk, blogstats__blog_id__in=blog_ids)
+        .values_list('blogstats__blog_id', flat=True)
+    )
+    return {blog_id async for blog_id in rows}
+
+
+def _member_count():
+    return Coalesce(Subquery(
+        LikeMembership.objects.filter(blogstats_id=OuterRef('pk'))
+        .order_by().values('blogstats_id').annotate(count=Count('id')).values('count')
+    ), 0)
+
+
+def _sharded_likes():
+    return Coalesce(Subquery(
+        BlogStatsShard.objects.filter(blog_id=OuterRef('blog_id'))
+        .order_by().values('blog_id').annotate(total=Sum('likes')).values('total')
+    ), 0)
+
+
+# Compare every like counter (BlogStats.likes plus any shard deltas) with its
+# membership count, chunk by chunk. Drifted counters are recomputed in SQL, so
+# likes landing in between are kept.
+# Returns (rows checked, [(blog_id, stored, members), ...]).
+def reconcile_like_counts(chunk_size=1000, fix=True):
+    checked, drift, last_id = 0, [], 0
+    while True:
+        chunk = list(
+            BlogStats.objects.filter(id__gt=last_id)
+            .annotate(counted=F('likes') + _sharded_likes(), members=_member_count())
+            .order_by('id').values_list('id', 'blog_id', 'counted', 'members')[:chunk_size]
+        )
+        if not chunk:
+            break
+        stale = [row for row in chunk if row[2] != row[3]]
+        if stale and fix:
+            BlogStats.objects.filter(pk__in=[row[0] for row in stale]).update(
+                likes=Greatest(_member_count() - _sharded_likes(), 0)
+            )
+        drift += [(blog_id, likes, members) for _, blog_id, likes, members in stale]
+        checked += len(chunk)
+        last_id = chunk[-1][0]
+    return checked, drift
@@ -0,0 +1,91 @@
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+# ! Outbound mail queue
+# Requests only INSERT an OutboundEmail; `manage.py send_queued_mail` claims due
+# rows in batches, sends them over one EMAIL_BACKEND connection and records the
+# outcome. A failed message is retried after MAIL_QUEUE_RETRY_DELAY *
+# 2^(attempts - 1) seconds (the delay itself after the first failure) and given
+# up after MAIL_QUEUE_MAX_ATTEMPTS. Claimed rows are leased for
+# MAIL_QUEUE_LEASE seconds, so a worker that dies mid-batch only delays them and
+# parallel workers never send the same row.
+
+
+def queue_mail(subject, message, recipient_list, from_email=None):
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=','.join(recipient_list),
+    )
+
+
+def _claim(batch_size, now):
+    with transaction.atomic():
+        due = (
+            OutboundEmail.objects.select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+            .filter(status=OutboundEmail.QUEUED, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        batch = list(due)
+        OutboundEmail.objects.filter(id__in=[email.id for email in batch]).update(
+            next_attempt_at=now + datetime.timedelta(seconds=settings.MAIL_QUEUE_LEASE)
+        )
+    return batch
+
+
+def _failed(email, error, now):
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= settings.MAIL_QUEUE_MAX_ATTEMPTS:
+        email.status = OutboundEmail.FAILED
+    else:
+        email.next_attempt_at = now + datetime.timedelta(
+            seconds=settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (email.attempts - 1)
+        )
+
+
+# Send one batch of due messages; returns (sent, failed attempts)
+def send_queued_mail(batch_size=100):
+    now = timezone.now()
+    batch = _claim(batch_size, now)
+    if not batch:
+        return 0, 0
+
+    sent, failed = [], []
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as e:
+        # Server unreachable: the whole batch counts as one failed attempt
+        for email in batch:
+            _failed(email, e, now)
+        failed = batch
+    else:
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, email.to.split(','), connection=mail_connection
+                )
+                try:
+                    message.send()
+                except Exception as e:
+                    _failed(email, e, now)
+                    failed.append(email)
+                else:
+                    email.status, email.sent_at = OutboundEmail.SENT, timezone.now()
+                    email.attempts += 1
+                    sent.append(email)
+        finally:
+            mail_connection.close()
+
+    OutboundEmail.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return len(sent), len(failed)
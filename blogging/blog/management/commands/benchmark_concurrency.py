@@ -0,0 +1,133 @@
+import asyncio
+import io
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from blog import urls as blog_urls
+from blog.async_views import with_async_views
+
+
+# Routes under /api/ with the read-heavy views either sync or async
+def _urlconf(use_async):
+    urlconf = types.ModuleType(f"benchmark_urls_{'async' if use_async else 'sync'}")
+    urlconf.urlpatterns = [path('api/', include(with_async_views(blog_urls.urlpatterns, use_async)))]
+    return urlconf
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare WSGI and ASGI throughput for the read-heavy GETs with many slow clients. "
+        "Runs in process: every client reads each response body with --client-delay seconds of latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help="Concurrent clients.")
+        parser.add_argument('--requests', type=int, default=5, help="Requests per client.")
+        parser.add_argument('--workers', type=int, default=8, help="WSGI worker threads (like gunicorn --threads).")
+        parser.add_argument('--client-delay', type=float, default=0.05, help="Seconds a client takes to read a response.")
+        parser.add_argument('--path', action='append', dest='paths', help="Path to request, may be repeated (default /api/blogs/).")
+        parser.add_argument(
+            '--phase', action='append', dest='phases', choices=['wsgi', 'asgi-sync', 'asgi'],
+            help="wsgi: sync views on a thread pool; asgi-sync: sync views under ASGI; asgi: async views under ASGI. Default: all.",
+        )
+
+    def handle(self, *args, **options):
+        self.paths = options['paths'] or ['/api/blogs/']
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+        self.host = 'localhost' if not hosts or 'localhost' in hosts else hosts[0]
+        self.delay = options['client_delay']
+        clients, per_client = options['clients'], options['requests']
+        self.stdout.write(
+            f"{clients} clients x {per_client} requests, {self.delay * 1000:.0f} ms client delay, paths: {', '.join(self.paths)}"
+        )
+
+        for phase in options['phases'] or ['wsgi', 'asgi-sync', 'asgi']:
+            with override_settings(ROOT_URLCONF=_urlconf(use_async=phase == 'asgi')):
+                started = time.monotonic()
+                if phase == 'wsgi':
+                    statuses = self.run_wsgi(clients, per_client, options['workers'])
+                else:
+                    statuses = asyncio.run(self.run_asgi(clients, per_client))
+                elapsed = time.monotonic() - started
+            connections.close_all()
+            errors = sum(1 for status in statuses if status != 200)
+            label = f"wsgi ({options['workers']} threads)" if phase == 'wsgi' else phase
+            self.stdout.write(
+                f"{label}: {len(statuses)} requests in {elapsed:.2f}s "
+                f"({len(statuses) / elapsed:.1f}/s), {errors} non-200 responses"
+            )
+
+    def _targets(self, client, per_client):
+        for i in range(per_client):
+            yield urlsplit(self.paths[(client + i) % len(self.paths)])
+
+    # A worker thread stays busy until its client has read the whole body
+    def run_wsgi(self, clients, per_client, workers):
+        application = WSGIHandler()
+
+        def request(target):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': target.path, 'QUERY_STRING': target.query,
+                'SCRIPT_NAME': '', 'SERVER_NAME': self.host, 'SERVER_PORT': '80', 'HTTP_HOST': self.host,
+                'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+                'wsgi.errors': io.StringIO(),
+            }
+            status = []
+            body = application(environ, lambda line, headers: status.append(int(line.split()[0])))
+            try:
+                for _ in body:
+                    time.sleep(self.delay)
+            finally:
+                body.close()
+            return status[0]
+
+        targets = [target for client in range(clients) for target in self._targets(client, per_client)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(request, targets))
+
+    # One coroutine per client; waiting on a slow client holds no thread
+    async def run_asgi(self, clients, per_client):
+        application = ASGIHandler()
+
+        async def request(target):
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': target.path, 'raw_path': target.path.encode(), 'root_path': '',
+                'query_string': target.query.encode(), 'headers': [(b'host', self.host.encode())],
+                'client': ('127.0.0.1', 0), 'server': (self.host, 80),
+            }
+            status = []
+            received = False
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # The client never disconnects; Django cancels this once it has responded
+                await asyncio.Future()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+                elif message['type'] == 'http.response.body':
+                    await asyncio.sleep(self.delay)
+
+            await application(scope, receive, send)
+            return status[0]
+
+        async def client(index):
+            return [await request(target) for target in self._targets(index, per_client)]
+
+        results = await asyncio.gather(*(client(index) for index in range(clients)))
+        return [status for statuses in results for status in statuses]
@@ -0,0 +1,62 @@
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from blog.counters import COUNTER_FIELDS, add_to_counters, compact_shards
+from blog.models import Blog, BlogStats, User
+
+
+class Command(BaseCommand):
+    help = "Measure concurrent increments of one hot blog's counter, with and without sharding."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--increments', type=int, default=200, help="Increments per thread.")
+        parser.add_argument('--shards', type=int, default=8)
+        parser.add_argument('--field', choices=COUNTER_FIELDS, default='views')
+
+    def handle(self, *args, **options):
+        # A throwaway blog so real counters are never touched
+        name = f"bench-{uuid.uuid4().hex[:12]}"
+        user = User.objects.create_user(username=name, email=f"{name}@example.invalid")
+        blog = Blog.objects.create(title=name, content=name, author=user)
+        try:
+            for shards in (1, options['shards']):
+                self.run(blog, shards, options)
+        finally:
+            user.delete()
+
+    def run(self, blog, shards, options):
+        field, threads, increments = options['field'], options['threads'], options['increments']
+        BlogStats.objects.filter(blog=blog).update(**{field: 0})
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(increments):
+                    try:
+                        add_to_counters(field, {blog.id: 1}, shards=shards)
+                    except DatabaseError as e:
+                        errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.monotonic()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        if shards > 1:
+            compact_shards(blog_ids=[blog.id])
+        total = BlogStats.objects.values_list(field, flat=True).get(blog=blog)
+        label = "direct" if shards <= 1 else f"{shards} shards"
+        self.stdout.write(
+            f"{label}: {threads * increments} increments by {threads} threads in {elapsed:.2f}s "
+            f"({threads * increments / elapsed:.0f}/s), counted {total}, {len(errors)} errors"
+        )
@@ -0,0 +1,62 @@
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.hashers import ConfigurablePBKDF2PasswordHasher
+from blog.serializers import LoginSerializer
+from blog.models import User
+
+
+class Command(BaseCommand):
+    help = "Measure login throughput by username, by email, and for failed attempts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--attempts', type=int, default=20, help="Attempts per thread and case.")
+
+    def handle(self, *args, **options):
+        # A throwaway account so real users are never touched
+        name = f"bench-{uuid.uuid4().hex[:12]}"
+        password = uuid.uuid4().hex
+        user = User.objects.create_user(username=name, email=f"{name}@example.invalid", password=password)
+        cases = [
+            ("username", user.username, password, True),
+            ("email", user.email, password, True),
+            ("wrong password", user.email, "not-the-password", False),
+            ("unknown user", f"nobody-{name}", password, False),
+        ]
+        self.stdout.write(f"PBKDF2 iterations: {ConfigurablePBKDF2PasswordHasher().iterations}")
+        try:
+            for label, identifier, attempt_password, expected in cases:
+                self.run(label, identifier, attempt_password, expected, options)
+        finally:
+            user.delete()
+
+    def run(self, label, identifier, password, expected, options):
+        threads, attempts = options['threads'], options['attempts']
+        mismatches = []
+
+        def worker():
+            try:
+                for _ in range(attempts):
+                    serializer = LoginSerializer(data={'identifier': identifier, 'password': password})
+                    if serializer.is_valid() != expected:
+                        mismatches.append(serializer.errors)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.monotonic()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.monotonic() - started
+        total = threads * attempts
+        self.stdout.write(
+            f"{label}: {total} logins by {threads} threads in {elapsed:.2f}s "
+            f"({total / elapsed:.1f}/s, {elapsed / total * 1000:.1f} ms each), {len(mismatches)} unexpected results"
+        )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_blog_list_cache
+from blog.counters import compact_shards
+
+
+class Command(BaseCommand):
+    help = "Fold sharded view/like/share counters back into BlogStats."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--interval', type=int, help="Keep running, compacting every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            compacted = compact_shards(chunk_size=options['chunk_size'])
+            if compacted:
+                invalidate_blog_list_cache()
+            self.stdout.write(f"Compacted counters of {compacted} blogs in {time.monotonic() - started:.2f}s.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
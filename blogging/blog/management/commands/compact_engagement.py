@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.engagement import compact_engagement
+
+
+class Command(BaseCommand):
+    help = "Compact aged engagement history from hourly to daily to monthly buckets."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--interval', type=int, help="Keep running, compacting every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            compacted = compact_engagement(chunk_size=options['chunk_size'])
+            self.stdout.write(f"Compacted {compacted} engagement buckets in {time.monotonic() - started:.2f}s.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Blog, Comment, User
+
+
+class Command(BaseCommand):
+    help = "Print the database EXPLAIN plan for each blog list/detail query."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blog-id', type=int, help="Blog used for the detail/comments queries (default: latest).")
+        parser.add_argument('--user-id', type=int, help="Author used for the ?mine=true query (default: first user).")
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--format', dest='explain_format', help="EXPLAIN format passed to the backend, e.g. TREE or JSON on MySQL.")
+        parser.add_argument('--analyze', action='store_true', help="Run EXPLAIN ANALYZE where the backend supports it.")
+
+    def handle(self, *args, **options):
+        blog_id = options['blog_id'] or Blog.objects.order_by('-id').values_list('id', flat=True).first()
+        user_id = options['user_id'] or User.objects.order_by('id').values_list('id', flat=True).first()
+        if blog_id is None or user_id is None:
+            raise CommandError("Need at least one user and one blog to explain against.")
+
+        size = options['page_size']
+        public = Blog.objects.for_list().published()
+        queries = [
+            ("list newest", public.order_by('-publish_at')[:size]),
+            ("list oldest", public.order_by('publish_at')[:size]),
+            ("list title_asc", public.order_by('title')[:size]),
+            ("list title_desc", public.order_by('-title')[:size]),
+            ("list trending", public.order_by('-stats__trending_score', '-id')[:size]),
+            ("list mine", Blog.objects.for_list().alive().filter(author_id=user_id).order_by('-publish_at')[:size]),
+            ("detail", Blog.objects.alive().for_detail().filter(id=blog_id)),
+            ("comments", Comment.objects.filter(blog_id=blog_id, deleted_at__isnull=True).order_by('created_at')),
+        ]
+
+        explain_options = {}
+        if options['explain_format']:
+            explain_options['format'] = options['explain_format']
+        if options['analyze']:
+            explain_options['analyze'] = True
+
+        for name, queryset in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.revocation import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted JWT refresh tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--interval', type=int, help="Keep running, pruning every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            pruned = prune_expired_tokens(chunk_size=options['chunk_size'])
+            self.stdout.write(f"Pruned {pruned} expired tokens in {time.monotonic() - started:.2f}s.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.publishing import next_publish_due, publish_due_blogs
+
+
+class Command(BaseCommand):
+    help = "Publish every blog whose publish_at has passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, help="Keep running, checking at least every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due_blogs()
+            next_due = next_publish_due()
+            self.stdout.write(
+                f"Published {published} blogs. Next due: {next_due.isoformat() if next_due else 'none'}."
+            )
+            if not options['interval']:
+                break
+            # Wake up for the next scheduled post if it is due before the interval ends
+            delay = options['interval']
+            if next_due:
+                delay = min(delay, max(0.0, (next_due - timezone.now()).total_seconds()))
+            time.sleep(delay)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_blog_list_cache
+from blog.models import BlogSearchDocument
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the blog full-text search index in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--clear', action='store_true', help="Drop every search document before reindexing.")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            BlogSearchDocument.objects.all().delete()
+        indexed = get_search_backend().rebuild(chunk_size=options['chunk_size'])
+        invalidate_blog_list_cache()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} blogs."))
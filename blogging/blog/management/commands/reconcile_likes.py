@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_blog_list_cache
+from blog.likes import reconcile_like_counts
+
+
+class Command(BaseCommand):
+    help = "Recount BlogStats.likes from the liked-users table and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it.")
+        parser.add_argument('--interval', type=int, help="Keep running, reconciling every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            checked, drift = reconcile_like_counts(chunk_size=options['chunk_size'], fix=not options['dry_run'])
+            for blog_id, stored, members in drift:
+                self.stdout.write(f"Blog {blog_id}: likes={stored}, liked users={members}")
+            if drift and not options['dry_run']:
+                invalidate_blog_list_cache()
+            action = "found" if options['dry_run'] else "fixed"
+            self.stdout.write(f"Checked {checked} blogs, {action} {len(drift)} drifted like counters.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_blog_list_cache
+from blog.scores import refresh_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute the popularity and trending scores of every blog."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--interval', type=int, help="Keep running, refreshing every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            refreshed = refresh_scores(chunk_size=options['chunk_size'])
+            invalidate_blog_list_cache()
+            self.stdout.write(f"Refreshed scores for {refreshed} blogs in {time.monotonic() - started:.2f}s.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
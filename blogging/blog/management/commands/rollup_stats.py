@@ -0,0 +1,33 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.rollups import earliest_day, rollup_counters, rollup_site
+
+
+class Command(BaseCommand):
+    help = "Update the daily rollup tables behind the admin dashboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2, help="Recount signups/blogs/publications for this many recent days.")
+        parser.add_argument('--backfill', action='store_true', help="Recount signups/blogs/publications for the whole history.")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--interval', type=int, help="Keep running, rolling up every N seconds.")
+
+    def handle(self, *args, **options):
+        backfill = options['backfill']
+        while True:
+            started = time.monotonic()
+            today = timezone.localdate()
+            since = earliest_day() if backfill else today - datetime.timedelta(days=max(options['days'], 1) - 1)
+            days = rollup_site(since, today)
+            rolled = rollup_counters(today, chunk_size=options['chunk_size'])
+            self.stdout.write(
+                f"Recounted {days} days and rolled up counters of {rolled} blogs in {time.monotonic() - started:.2f}s."
+            )
+            if not options['interval']:
+                break
+            backfill = False
+            time.sleep(options['interval'])
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.mail import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = "Send queued outbound email in batches over one mail connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=int, help="Keep running, polling every N seconds when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            sent, failed = send_queued_mail(batch_size=options['batch_size'])
+            if sent or failed or not options['interval']:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed, in {time.monotonic() - started:.2f}s.")
+            if not options['interval']:
+                break
+            # Keep draining while there is a backlog
+            if sent + failed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_blogstats_likes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['is_published', 'deleted_at', 'publish_at'], name='blog_visible_publish_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['is_published', 'deleted_at', 'title'], name='blog_visible_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['author', 'deleted_at'], name='blog_author_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['blog', 'deleted_at', 'created_at'], name='comment_blog_live_idx'),
+        ),
+    ]
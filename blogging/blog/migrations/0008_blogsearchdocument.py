@@ -0,0 +1,86 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE blog_search_fts USING fts5("
+    "title, content, category, content='blog_blogsearchdocument', content_rowid='blog_id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER blog_search_fts_ai AFTER INSERT ON blog_blogsearchdocument BEGIN "
+    "INSERT INTO blog_search_fts(rowid, title, content, category) VALUES (new.blog_id, new.title, new.content, new.category); "
+    "END",
+    "CREATE TRIGGER blog_search_fts_ad AFTER DELETE ON blog_blogsearchdocument BEGIN "
+    "INSERT INTO blog_search_fts(blog_search_fts, rowid, title, content, category) VALUES ('delete', old.blog_id, old.title, old.content, old.category); "
+    "END",
+    "CREATE TRIGGER blog_search_fts_au AFTER UPDATE ON blog_blogsearchdocument BEGIN "
+    "INSERT INTO blog_search_fts(blog_search_fts, rowid, title, content, category) VALUES ('delete', old.blog_id, old.title, old.content, old.category); "
+    "INSERT INTO blog_search_fts(rowid, title, content, category) VALUES (new.blog_id, new.title, new.content, new.category); "
+    "END",
+    "INSERT INTO blog_search_fts(blog_search_fts) VALUES ('rebuild')",
+]
+
+
+def backfill_documents(apps, schema_editor):
+    Blog = apps.get_model('blog', 'Blog')
+    BlogSearchDocument = apps.get_model('blog', 'BlogSearchDocument')
+    last_id = 0
+    while True:
+        chunk = list(
+            Blog.objects.filter(deleted_at__isnull=True, id__gt=last_id)
+            .select_related('category').order_by('id')[:1000]
+        )
+        if not chunk:
+            break
+        BlogSearchDocument.objects.bulk_create([
+            BlogSearchDocument(
+                blog_id=blog.id, title=blog.title, content=blog.content,
+                category=blog.category.name if blog.category_id else '',
+            )
+            for blog in chunk
+        ])
+        last_id = chunk[-1].id
+
+
+# The inverted index is created after the backfill so it is built in one pass
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute(
+            "ALTER TABLE blog_blogsearchdocument ADD FULLTEXT INDEX blog_search_fulltext (title, content, category)"
+        )
+    elif vendor == 'sqlite':
+        for statement in SQLITE_FTS:
+            schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute("ALTER TABLE blog_blogsearchdocument DROP INDEX blog_search_fulltext")
+    elif vendor == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS blog_search_fts_{trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS blog_search_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_blog_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogSearchDocument',
+            fields=[
+                ('blog', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='blog.blog')),
+                ('title', models.CharField(max_length=200)),
+                ('content', models.TextField()),
+                ('category', models.CharField(blank=True, max_length=100)),
+            ],
+        ),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_blogsearchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogstats',
+            name='popularity_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='blogstats',
+            name='scores_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='blogstats',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='blogstats',
+            index=models.Index(fields=['popularity_score', 'blog'], name='stats_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogstats',
+            index=models.Index(fields=['trending_score', 'blog'], name='stats_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+
+
+def sync_publish_state(apps, schema_editor):
+    # Bring existing rows in line with Blog.save(): is_published <=> publish_at has passed
+    Blog = apps.get_model('blog', 'Blog')
+    now = timezone.now()
+    Blog.objects.filter(is_published=True, publish_at__gt=now).update(is_published=False)
+    Blog.objects.filter(is_published=False, publish_at__lte=now).update(is_published=True)
+    Blog.objects.filter(is_published=True, publish_at__isnull=True).update(publish_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_blogstats_scores'),
+    ]
+
+    operations = [
+        migrations.RunPython(sync_publish_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:15
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+CHUNK_SIZE = 1000
+
+
+def merge_likes(apps, schema_editor):
+    # Fold Blog.liked_users into BlogStats.liked_users (the union, so a user who
+    # is in both counts once) and recount BlogStats.likes from the memberships
+    Blog = apps.get_model('blog', 'Blog')
+    BlogStats = apps.get_model('blog', 'BlogStats')
+    BlogLike = Blog.liked_users.through
+    StatsLike = BlogStats.liked_users.through
+
+    BlogStats.objects.bulk_create(
+        [BlogStats(blog_id=pk) for pk in Blog.objects.filter(stats__isnull=True).values_list('id', flat=True)]
+    )
+
+    last_id = 0
+    while True:
+        chunk = list(BlogLike.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'blog_id', 'user_id')[:CHUNK_SIZE])
+        if not chunk:
+            break
+        stats_ids = dict(
+            BlogStats.objects.filter(blog_id__in={blog_id for _, blog_id, _ in chunk}).values_list('blog_id', 'id')
+        )
+        StatsLike.objects.bulk_create(
+            [StatsLike(blogstats_id=stats_ids[blog_id], user_id=user_id) for _, blog_id, user_id in chunk],
+            ignore_conflicts=True,
+        )
+        last_id = chunk[-1][0]
+
+    members = (
+        StatsLike.objects.filter(blogstats_id=OuterRef('pk'))
+        .order_by().values('blogstats_id').annotate(count=Count('id')).values('count')
+    )
+    BlogStats.objects.update(likes=Coalesce(Subquery(members), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_blog_publish_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_likes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='blog',
+            name='liked_users',
+        ),
+        migrations.RemoveField(
+            model_name='blog',
+            name='likes',
+        ),
+    ]
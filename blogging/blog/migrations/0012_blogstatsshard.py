@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_unify_likes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogStatsShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('views', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('shares', models.IntegerField(default=0)),
+                ('blog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stat_shards', to='blog.blog')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('blog', 'shard'), name='stats_shard_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_blogstatsshard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBlogStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('shares', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('shares', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailySiteStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('signups', models.PositiveIntegerField(default=0)),
+                ('blogs_created', models.PositiveIntegerField(default=0)),
+                ('publications', models.PositiveIntegerField(default=0)),
+                ('views', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('shares', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='blogstats',
+            name='rolled_likes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='blogstats',
+            name='rolled_shares',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='blogstats',
+            name='rolled_views',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='blogstats',
+            index=models.Index(fields=['views', 'blog'], name='stats_views_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailyblogstats',
+            name='blog',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='blog.blog'),
+        ),
+        migrations.AddField(
+            model_name='dailycategorystats',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='blog.category'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyblogstats',
+            constraint=models.UniqueConstraint(fields=('date', 'blog'), name='daily_blog_stats_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycategorystats',
+            constraint=models.UniqueConstraint(fields=('date', 'category'), name='daily_category_stats_unique'),
+        ),
+    ]
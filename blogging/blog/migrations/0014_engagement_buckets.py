@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogEngagementBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('views', 'views'), ('likes', 'likes'), ('shares', 'shares')], max_length=10)),
+                ('granularity', models.CharField(choices=[('hour', 'hour'), ('day', 'day'), ('month', 'month')], max_length=5)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.IntegerField()),
+                ('blog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement', to='blog.blog')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['blog', 'bucket_start'], name='engagement_blog_idx'), models.Index(fields=['granularity', 'bucket_start'], name='engagement_compact_idx')],
+            },
+        ),
+    ]
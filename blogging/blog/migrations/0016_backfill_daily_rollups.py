@@ -0,0 +1,84 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:05
+
+import datetime
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+CHUNK_SIZE = 1000
+COUNTERS = ('views', 'likes', 'shares')
+
+
+def backfill_rollups(apps, schema_editor):
+    # The dashboard reads only the rollups, so an existing site starts from its
+    # whole history instead of zeros: signups / new blogs / publications per
+    # day, and the current counters as growth on the day of the migration
+    # (what `rollup_stats --backfill` would write). Sites that already ran
+    # rollup_stats are left alone.
+    User = apps.get_model('blog', 'User')
+    Blog = apps.get_model('blog', 'Blog')
+    BlogStats = apps.get_model('blog', 'BlogStats')
+    DailySiteStats = apps.get_model('blog', 'DailySiteStats')
+    DailyBlogStats = apps.get_model('blog', 'DailyBlogStats')
+    DailyCategoryStats = apps.get_model('blog', 'DailyCategoryStats')
+    if DailySiteStats.objects.exists():
+        return
+
+    today = timezone.localdate()
+    site = defaultdict(lambda: dict.fromkeys(['signups', 'blogs_created', 'publications', *COUNTERS], 0))
+    site_counts = (
+        ('signups', User.objects.all(), 'date_joined'),
+        ('blogs_created', Blog.objects.all(), 'created_at'),
+        ('publications', Blog.objects.filter(is_published=True, publish_at__isnull=False), 'publish_at'),
+    )
+    for field, queryset, column in site_counts:
+        rows = queryset.annotate(day=TruncDate(column)).order_by().values('day').annotate(count=Count('id'))
+        for row in rows:
+            site[row['day']][field] = row['count']
+
+    categories = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    drifted = BlogStats.objects.exclude(
+        views=F('rolled_views'), likes=F('rolled_likes'), shares=F('rolled_shares')
+    )
+    last_id = 0
+    while True:
+        chunk = list(drifted.filter(id__gt=last_id).select_related('blog').order_by('id')[:CHUNK_SIZE])
+        if not chunk:
+            break
+        daily = []
+        for stats in chunk:
+            deltas = {field: getattr(stats, field) - getattr(stats, f'rolled_{field}') for field in COUNTERS}
+            daily.append(DailyBlogStats(date=today, blog_id=stats.blog_id, **deltas))
+            for field, delta in deltas.items():
+                site[today][field] += delta
+                setattr(stats, f'rolled_{field}', getattr(stats, field))
+                if stats.blog.category_id:
+                    categories[stats.blog.category_id][field] += delta
+        DailyBlogStats.objects.bulk_create(daily)
+        BlogStats.objects.bulk_update(chunk, [f'rolled_{field}' for field in COUNTERS])
+        last_id = chunk[-1].id
+
+    DailyCategoryStats.objects.bulk_create(
+        [DailyCategoryStats(date=today, category_id=pk, **deltas) for pk, deltas in categories.items()]
+    )
+    # One row per day from the first record on, like rollup_site()
+    if site:
+        first = min(site)
+        days = [first + datetime.timedelta(days=n) for n in range((max(today, max(site)) - first).days + 1)]
+        DailySiteStats.objects.bulk_create(
+            [DailySiteStats(date=day, **site[day]) for day in days], batch_size=CHUNK_SIZE
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_outbound_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:12
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+BUCKET = ('blog_id', 'event', 'granularity', 'bucket_start')
+
+
+def merge_buckets(apps, schema_editor):
+    # Buckets used to get one row per write; sum each bucket into its oldest row
+    BlogEngagementBucket = apps.get_model('blog', 'BlogEngagementBucket')
+    duplicates = (
+        BlogEngagementBucket.objects.order_by().values(*BUCKET)
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('count')).filter(rows__gt=1)
+    )
+    for bucket in list(duplicates):
+        BlogEngagementBucket.objects.filter(id=bucket['keep']).update(count=bucket['total'])
+        BlogEngagementBucket.objects.filter(**{field: bucket[field] for field in BUCKET}).exclude(id=bucket['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_backfill_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='blogengagementbucket',
+            constraint=models.UniqueConstraint(fields=('blog', 'event', 'granularity', 'bucket_start'), name='engagement_bucket_unique'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_engagement_bucket_unique'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='blogengagementbucket',
+            name='engagement_bucket_unique',
+        ),
+        migrations.AddField(
+            model_name='blogengagementbucket',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='blogengagementbucket',
+            constraint=models.UniqueConstraint(fields=('blog', 'event', 'granularity', 'bucket_start', 'shard'), name='engagement_bucket_unique'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from django.db import models
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber, Substr
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 
 
@@ -22,6 +24,75 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+# ! Blog queryset
+class BlogQuerySet(models.QuerySet):
+    EXCERPT_LENGTH = 200
+
+    def alive(self):
+        return self.filter(deleted_at__isnull=True)
+
+    # Visibility filter shared by every public read (see Blog.Meta.indexes).
+    # Scheduled posts are flipped by blog/publishing.py, so no clock is involved.
+    def published(self):
+        return self.alive().filter(is_published=True)
+
+    def visible_to(self, user):
+        if user.is_authenticated:
+            return self.alive().filter(Q(is_published=True) | Q(author=user))
+        return self.published()
+
+    # Shape used by list endpoints: author, category and stats are joined and the
+    # live comment count is a correlated subquery, so a page costs one query
+    # whatever its size. The full content column is never fetched.
+    # `fields` (output field names, None for all) drops unrequested joins.
+    def for_list(self, fields=None):
+        wanted = lambda name: fields is None or name in fields
+        queryset = self.defer('content')
+        related = [name for name in ('author', 'category', 'stats') if wanted(name)]
+        if related:
+            queryset = queryset.select_related(*related)
+        if wanted('excerpt'):
+            queryset = queryset.annotate(excerpt=Substr('content', 1, self.EXCERPT_LENGTH))
+        if wanted('comment_count'):
+            queryset = queryset.annotate(comment_count=Coalesce(Subquery(live_comments('count', Count('id'))), 0))
+        return queryset
+
+    # Detail shape: author, category and stats are joined and the live comment
+    # count / latest comment time (also the conditional GET validators, see
+    # blog/conditional.py) are annotated, so visibility, validators and the
+    # payload come from one row. Comments are loaded after the 304 check with
+    # recent_comments().
+    def for_detail(self, fields=None):
+        wanted = lambda name: fields is None or name in fields
+        related = ['stats'] + [name for name in ('author', 'category') if wanted(name)]
+        return self.select_related(*related).annotate(
+            comment_count=Coalesce(Subquery(live_comments('count', Count('id'))), 0),
+            last_comment_at=Subquery(live_comments('latest', Max('created_at'))),
+        )
+
+
+# Aggregate over a blog's non-deleted comments, for use as a correlated subquery
+def live_comments(name, aggregate):
+    return (
+        Comment.objects.filter(blog=OuterRef('pk'), deleted_at__isnull=True)
+        .order_by()
+        .values('blog')
+        .annotate(**{name: aggregate})
+        .values(name)
+    )
+
+# Prefetch of the newest `limit` live comments of each blog, with their authors.
+# Bounded by ROW_NUMBER() rather than a slice so it still fills blog.comments.
+def recent_comments(limit):
+    newest_first = [models.F('created_at').desc(), models.F('id').desc()]
+    return models.Prefetch(
+        'comments',
+        queryset=Comment.objects.filter(deleted_at__isnull=True)
+        .annotate(position=Window(RowNumber(), partition_by=models.F('blog'), order_by=newest_first))
+        .filter(position__lte=limit)
+        .select_related('author').order_by(*newest_first),
+    )
+
 # ! Blog model
 class Blog(models.Model):
     title = models.CharField(max_length=200)
@@ -34,17 +105,34 @@ class Blog(models.Model):
     is_published = models.BooleanField(default=False)
     publish_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
-    likes = models.PositiveIntegerField(default=0)
-    liked_users = models.ManyToManyField(User, related_name='liked_blogs_main', blank=True)
+
+    objects = BlogQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # deleted_at IS NULL + is_published are equality predicates, so the
+            # sort column comes last and ORDER BY can walk the index
+            models.Index(fields=['is_published', 'deleted_at', 'publish_at'], name='blog_visible_publish_idx'),
+            models.Index(fields=['is_published', 'deleted_at', 'title'], name='blog_visible_title_idx'),
+            # ?mine=true
+            models.Index(fields=['author', 'deleted_at'], name='blog_author_live_idx'),
+        ]
     
 
     def soft_delete(self):
         self.deleted_at = timezone.now()
         self.save()
     
+    # is_published is True exactly when publish_at has passed; future posts
+    # wait for the publish_scheduled_blogs command
+    def sync_publish_state(self):
+        if self.publish_at:
+            self.is_published = self.publish_at <= timezone.now()
+        elif self.is_published:
+            self.publish_at = timezone.now()
+
     def save(self, *args, **kwargs):
-        if self.publish_at and self.publish_at <= timezone.now():
-            self.is_published = True
+        self.sync_publish_state()
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -58,6 +146,11 @@ class Comment(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['blog', 'deleted_at', 'created_at'], name='comment_blog_live_idx'),
+        ]
+
     def soft_delete(self):
         self.deleted_at = timezone.now()
         self.save()
@@ -69,15 +162,194 @@ class Comment(models.Model):
 class BlogStats(models.Model):
     blog = models.OneToOneField(Blog, on_delete=models.CASCADE, related_name='stats')
     views = models.PositiveIntegerField(default=0)
+    # The only like store: liked_users is authoritative and likes is its count,
+    # kept in step by blog/likes.py and checked by `manage.py reconcile_likes`
     liked_users = models.ManyToManyField(User, related_name="liked_blogs", blank=True)
     shares = models.PositiveIntegerField(default=0)
     likes = models.PositiveIntegerField(default=0)
+    # Precomputed ranking scores, refreshed by `manage.py refresh_blog_scores` (blog/scores.py)
+    popularity_score = models.FloatField(default=0)
+    trending_score = models.FloatField(default=0)
+    scores_updated_at = models.DateTimeField(null=True, blank=True)
+    # Totals already attributed to the daily rollups (blog/rollups.py)
+    rolled_views = models.PositiveIntegerField(default=0)
+    rolled_likes = models.PositiveIntegerField(default=0)
+    rolled_shares = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # blog_id is included so sort=popular/trending pages are an index range scan
+            models.Index(fields=['popularity_score', 'blog'], name='stats_popular_idx'),
+            models.Index(fields=['trending_score', 'blog'], name='stats_trending_idx'),
+            # Top blogs by views on the admin dashboard
+            models.Index(fields=['views', 'blog'], name='stats_views_idx'),
+        ]
     
     def __str__(self):
         return f"Stats for {self.blog.title}"
 
+# ! Counter shards (BLOG_COUNTER_SHARDS > 1, see blog/counters.py)
+# Increments for a hot post are spread over several rows instead of queueing on
+# its BlogStats row; `manage.py compact_counter_shards` folds them back.
+class BlogStatsShard(models.Model):
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='stat_shards')
+    shard = models.PositiveSmallIntegerField()
+    # Deltas not yet folded into BlogStats; likes go negative on unlike
+    views = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+    shares = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['blog', 'shard'], name='stats_shard_unique'),
+        ]
+
+    def __str__(self):
+        return f"Stats shard {self.shard} for blog {self.blog_id}"
+
+# ! Daily rollups behind admin_stats (`manage.py rollup_stats`, see blog/rollups.py)
+# Engagement deltas can be negative (unlikes), hence the signed counters.
+class DailySiteStats(models.Model):
+    date = models.DateField(unique=True)
+    signups = models.PositiveIntegerField(default=0)
+    blogs_created = models.PositiveIntegerField(default=0)
+    publications = models.PositiveIntegerField(default=0)
+    views = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+    shares = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Site stats for {self.date}"
+
+class DailyBlogStats(models.Model):
+    date = models.DateField()
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='daily_stats')
+    views = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+    shares = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'blog'], name='daily_blog_stats_unique'),
+        ]
+
+    def __str__(self):
+        return f"Stats for blog {self.blog_id} on {self.date}"
+
+class DailyCategoryStats(models.Model):
+    date = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_stats')
+    views = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+    shares = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category'], name='daily_category_stats_unique'),
+        ]
+
+    def __str__(self):
+        return f"Stats for category {self.category_id} on {self.date}"
+
+# ! Engagement history (hourly / daily / monthly buckets, see blog/engagement.py)
+class BlogEngagementBucket(models.Model):
+    EVENTS = ('views', 'likes', 'shares')
+    GRANULARITIES = ('hour', 'day', 'month')
+
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='engagement')
+    event = models.CharField(max_length=10, choices=[(event, event) for event in EVENTS])
+    granularity = models.CharField(max_length=5, choices=[(size, size) for size in GRANULARITIES])
+    bucket_start = models.DateTimeField()
+    # Counter shard the writes came from (0 unsharded and once compacted)
+    shard = models.PositiveSmallIntegerField(default=0)
+    # Signed: unlikes subtract
+    count = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            # One row per bucket and shard; writes add to it
+            models.UniqueConstraint(
+                fields=['blog', 'event', 'granularity', 'bucket_start', 'shard'], name='engagement_bucket_unique',
+            ),
+        ]
+        indexes = [
+            # Per-blog series
+            models.Index(fields=['blog', 'bucket_start'], name='engagement_blog_idx'),
+            # Compaction scans
+            models.Index(fields=['granularity', 'bucket_start'], name='engagement_compact_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.count} {self.event} for blog {self.blog_id} ({self.granularity} of {self.bucket_start})"
+
+# ! Search document (indexed text of a live blog, see blog/search.py)
+class BlogSearchDocument(models.Model):
+    blog = models.OneToOneField(Blog, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    category = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return f"Search document for {self.title}"
+
+# ! Outbound mail queue (blog/mail.py, sent by `manage.py send_queued_mail`)
+class OutboundEmail(models.Model):
+    QUEUED, SENT, FAILED = 'queued', 'sent', 'failed'
+    STATUSES = [(QUEUED, 'Queued'), (SENT, 'Sent'), (FAILED, 'Failed')]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    # Comma-separated addresses
+    to = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's "due" scan
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to} ({self.status})"
+
 @receiver(post_save, sender=Blog)
 def create_blog_stats(sender, instance, created, **kwargs):
     if created and not hasattr(instance, 'stats'):
         stats = BlogStats.objects.get_or_create(blog=instance)
-        
\ No newline at end of file
+
+# ! Keep the search index in sync with blog edits and soft deletes
+@receiver(post_save, sender=Blog)
+def update_search_document(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .search import index_blogs
+    index_blogs([instance])
+
+@receiver(post_save, sender=Category)
+def rename_search_category(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        BlogSearchDocument.objects.filter(blog__category=instance).update(category=instance.name)
+
+@receiver(pre_delete, sender=Category)
+def clear_search_category(sender, instance, **kwargs):
+    BlogSearchDocument.objects.filter(blog__category=instance).update(category='')
+
+# ! Invalidate cached anonymous blog lists (blog/cache.py). Blog.save and
+# soft_delete both end in post_save; counters only age out through the TTL.
+@receiver([post_save, post_delete], sender=Blog)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_blog_lists(sender, **kwargs):
+    from .cache import invalidate_blog_list_cache
+    invalidate_blog_list_cache()
+
+# ! Drop cached JWT users (blog/authentication.py) on every user change
+@receiver([post_save, post_delete], sender=User)
+def expire_cached_user(sender, instance, **kwargs):
+    from .authentication import forget_cached_user
+    forget_cached_user(instance.pk)
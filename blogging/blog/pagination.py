@@ -0,0 +1,193 @@
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+# ! Keyset orderings for the blog list: sort -> (column, descending)
+# Every ordering is made total by using the primary key as tie-breaker.
+BLOG_CURSOR_ORDERINGS = {
+    'newest': ('publish_at', True),
+    'oldest': ('publish_at', False),
+    'title_asc': ('title', False),
+    'title_desc': ('title', True),
+    'popular': ('stats__popularity_score', True),
+    'trending': ('stats__trending_score', True),
+}
+
+# ! Keyset orderings for a blog's comments
+COMMENT_CURSOR_ORDERINGS = {
+    'newest': ('created_at', True),
+    'oldest': ('created_at', False),
+}
+MAX_COMMENT_PAGE_SIZE = 100
+MAX_BLOG_PAGE_SIZE = 100
+
+
+# ?page_size= clamped to 1..maximum; ValueError when it is not an integer
+def page_size_param(params, default, maximum):
+    return min(max(int(params.get('page_size', default)), 1), maximum)
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(payload, dict) or not isinstance(payload.get('id'), int) or not 0 <= payload['id'] < 2 ** 63:
+        raise InvalidCursor('Invalid cursor')
+    return payload
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        raw = value.get('dt')
+        parsed = parse_datetime(raw) if isinstance(raw, str) else None
+        if parsed is None:
+            raise InvalidCursor('Invalid cursor')
+        return parsed
+    return value
+
+
+def _model_field(model, path):
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _resolve(obj, path):
+    for attr in path.split('__'):
+        obj = getattr(obj, attr, None)
+        if obj is None:
+            return None
+    return obj
+
+
+class CursorPage:
+    def __init__(self, items, next_cursor, previous_cursor):
+        self.object_list = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+
+# ! Keyset (seek) pagination: WHERE (column, id) > (last column, last id)
+# instead of OFFSET, and no COUNT(*).
+class CursorPaginator:
+    def __init__(self, queryset, field, descending, page_size, key=''):
+        self.queryset = queryset
+        self.field = field
+        self.descending = descending
+        self.page_size = page_size
+        # Cursors are only valid for the ordering they were issued for
+        self.key = key or f"{field}:{'desc' if descending else 'asc'}"
+
+    def _ordered(self, ascending):
+        if ascending:
+            return self.queryset.order_by(self.field, 'id')
+        return self.queryset.order_by(f'-{self.field}', '-id')
+
+    def _after(self, value, pk, ascending):
+        # Rows that come strictly after (value, pk) in the traversal order.
+        # NULLs are placed where the database naturally sorts them.
+        nulls_first = ascending != connection.features.nulls_order_largest
+        lookup = 'gt' if ascending else 'lt'
+        isnull = f'{self.field}__isnull'
+        if value is None:
+            condition = Q(**{isnull: True, f'id__{lookup}': pk})
+            if nulls_first:
+                condition |= Q(**{isnull: False})
+        else:
+            condition = Q(**{f'{self.field}__{lookup}': value}) | Q(**{self.field: value, f'id__{lookup}': pk})
+            if not nulls_first:
+                condition |= Q(**{isnull: True})
+        return condition
+
+    # The cursor value as the sort column's type, so a tampered token is a 400
+    # here instead of an error from the database
+    def _coerce(self, value):
+        if value is None:
+            return None
+        try:
+            value = _model_field(self.queryset.model, self.field).to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor('Invalid cursor')
+        if isinstance(value, float) and not math.isfinite(value):
+            raise InvalidCursor('Invalid cursor')
+        if isinstance(value, datetime) and timezone.is_naive(value):
+            raise InvalidCursor('Invalid cursor')
+        return value
+
+    def cursor_for(self, obj, backwards=False):
+        payload = {'k': self.key, 'v': _dump_value(_resolve(obj, self.field)), 'id': obj.pk}
+        if backwards:
+            payload['b'] = 1
+        return encode_cursor(payload)
+
+    # (query, to_page): the rows to fetch, up to page_size + 1, and how to turn
+    # them into a CursorPage. The caller runs the query, sync or async
+    # (blog/reads.py).
+    def page_query(self, token):
+        if not token:
+            query, backwards, first = self._ordered(not self.descending), False, True
+        else:
+            payload = decode_cursor(token)
+            if payload.get('k') != self.key:
+                raise InvalidCursor('Cursor does not match the requested sort')
+            value = self._coerce(_load_value(payload.get('v')))
+            backwards, first = bool(payload.get('b')), False
+            ascending = self.descending == backwards
+            query = self._ordered(ascending).filter(self._after(value, payload['id'], ascending))
+        return query[:self.page_size + 1], lambda rows: self._page(list(rows), backwards, first)
+
+    def _page(self, rows, backwards, first):
+        has_more = len(rows) > self.page_size
+        items = rows[:self.page_size]
+        if first:
+            return CursorPage(items, self.cursor_for(items[-1], False) if has_more else None, None)
+
+        if backwards:
+            items.reverse()
+            next_cursor = self.cursor_for(items[-1], False) if items else None
+            previous_cursor = self.cursor_for(items[0], True) if has_more else None
+        else:
+            next_cursor = self.cursor_for(items[-1], False) if has_more else None
+            previous_cursor = self.cursor_for(items[0], True) if items else None
+        return CursorPage(items, next_cursor, previous_cursor)
+
+    def get_page(self, token):
+        query, to_page = self.page_query(token)
+        return to_page(query)
+
+
+def comment_paginator(comments, sort, page_size):
+    field, descending = COMMENT_CURSOR_ORDERINGS[sort]
+    return CursorPaginator(comments, field, descending, page_size, key=f'comments:{sort}')
+
+
+# ?since= polling: walks forward in (created_at, id) from the given position
+def comment_since_paginator(comments, page_size):
+    return CursorPaginator(comments, 'created_at', False, page_size, key='comments:since')
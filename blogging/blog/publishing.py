@@ -0,0 +1,26 @@
+from django.utils import timezone
+
+from .cache import invalidate_blog_list_cache
+from .models import Blog
+
+# ! Scheduled publishing
+# Blog.save() keeps is_published False while publish_at is in the future, so
+# reads only filter on is_published. Due posts are flipped here in a single
+# UPDATE, run periodically by the publish_scheduled_blogs command.
+
+
+def scheduled_blogs():
+    return Blog.objects.alive().filter(is_published=False, publish_at__isnull=False)
+
+
+def publish_due_blogs(now=None):
+    now = now or timezone.now()
+    published = scheduled_blogs().filter(publish_at__lte=now).update(is_published=True, updated_at=now)
+    # update() sends no post_save, so the list cache is invalidated here
+    if published:
+        invalidate_blog_list_cache()
+    return published
+
+
+def next_publish_due():
+    return scheduled_blogs().order_by('publish_at').values_list('publish_at', flat=True).first()
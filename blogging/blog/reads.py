@@ -0,0 +1,346 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import aprefetch_related_objects, prefetch_related_objects
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import blog_list_cache_key, cache_blog_list, get_cached_blog_list
+from .conditional import blog_detail_validators, blog_list_validators, conditional_response, set_validators
+from .counters import asharded_totals, sharded_totals, view_counter
+from .likes import aliked_blog_ids, liked_blog_ids
+from .models import Blog, Category, Comment, recent_comments
+from .pagination import (
+    BLOG_CURSOR_ORDERINGS, COMMENT_CURSOR_ORDERINGS, MAX_BLOG_PAGE_SIZE, MAX_COMMENT_PAGE_SIZE,
+    CursorPaginator, InvalidCursor, comment_paginator, comment_since_paginator, page_size_param,
+)
+from .search import search_blogs
+from .serializers import BlogListSerializer, BlogSerializer, CategorySerializer, CommentSerializer, field_selection
+
+# ! GET logic of the read-heavy endpoints, shared by the sync and async views
+# Each reader is a generator: it yields the database and cache work it needs as
+# Fetch / Count / Call steps, is sent each result back and returns the
+# Response. run() performs the steps with the sync ORM (blog/views.py) and
+# arun() with the async ORM (blog/async_views.py). Between steps a reader only
+# works on rows that are already loaded, so nothing in a reader may touch the
+# ORM directly (no lazy relation access, no .count() / .exists()): that work
+# must be a step, or it would block the event loop under arun().
+
+
+class Fetch:
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def run(self):
+        return list(self.queryset)
+
+    async def arun(self):
+        return [row async for row in self.queryset]
+
+
+class Count:
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def run(self):
+        return self.queryset.count()
+
+    async def arun(self):
+        return await self.queryset.acount()
+
+
+# A helper and its async version; helpers without one run in a thread
+class Call:
+    def __init__(self, func, *args, afunc=None):
+        self.func = func
+        self.args = args
+        self.afunc = afunc
+
+    def run(self):
+        return self.func(*self.args)
+
+    async def arun(self):
+        if self.afunc is not None:
+            return await self.afunc(*self.args)
+        return await sync_to_async(self.func)(*self.args)
+
+
+def run(reader):
+    try:
+        step = next(reader)
+        while True:
+            step = reader.send(step.run())
+    except StopIteration as done:
+        return done.value
+
+
+async def arun(reader):
+    try:
+        step = next(reader)
+        while True:
+            step = reader.send(await step.arun())
+    except StopIteration as done:
+        return done.value
+
+
+def _error(detail, code=status.HTTP_400_BAD_REQUEST):
+    return Response({'detail': detail}, status=code)
+
+
+# What get_object_or_404 + DRF answer
+def _not_found(model):
+    return _error(f'No {model._meta.object_name} matches the given query.', status.HTTP_404_NOT_FOUND)
+
+
+# Filtered and sorted list queryset; builds the query only, nothing is executed here
+def blog_list_queryset(request, fields):
+    if request.GET.get('mine') == 'true' and request.user.is_authenticated:
+        # Only blogs created by logged-in user
+        blogs = Blog.objects.for_list(fields).alive().filter(author=request.user)
+    else:
+        # Published blogs, plus the user's own drafts when logged in
+        blogs = Blog.objects.for_list(fields).visible_to(request.user)
+
+    # Full-text search over title, content and category name
+    search_query = request.GET.get('search')
+    if search_query:
+        blogs = search_blogs(blogs, search_query)
+
+    # Filter by category
+    category_name = request.GET.get('category')
+    if category_name:
+        blogs = blogs.filter(category__name__iexact=category_name)
+
+    # Sorting
+    sort_by = request.GET.get('sort', 'newest')
+    if sort_by == 'newest':
+        blogs = blogs.order_by('-publish_at')
+    elif sort_by == 'oldest':
+        blogs = blogs.order_by('publish_at')
+    elif sort_by == 'title_asc':
+        blogs = blogs.order_by('title')
+    elif sort_by == 'title_desc':
+        blogs = blogs.order_by('-title')
+    elif sort_by in ('popular', 'trending'):
+        # Precomputed scores on BlogStats (manage.py refresh_blog_scores)
+        score = 'stats__popularity_score' if sort_by == 'popular' else 'stats__trending_score'
+        blogs = blogs.select_related('stats').order_by(f'-{score}', '-id')
+    elif sort_by == 'relevance':
+        blogs = blogs.order_by('-search_rank', '-id') if search_query else blogs.order_by('-publish_at')
+    return blogs, sort_by, search_query
+
+
+# ! Blog list
+def blog_list(request):
+    # Anonymous responses are cached per normalized query string
+    cache_key = None
+    if not request.user.is_authenticated:
+        cache_key = yield Call(blog_list_cache_key, request.GET)
+        cached = yield Call(get_cached_blog_list, cache_key)
+        if cached is not None:
+            data, etag = cached
+            response = conditional_response(request, etag) or Response(data)
+            response['X-Cache'] = 'HIT'
+            return set_validators(response, etag)
+
+    # ?fields= / ?omit= also decide which joins the page query makes
+    selection = field_selection(request)
+    fields = BlogListSerializer.selected_fields(**selection)
+    blogs, sort_by, search_query = blog_list_queryset(request, fields)
+
+    try:
+        page_size = page_size_param(request.GET, 10, MAX_BLOG_PAGE_SIZE)
+    except ValueError:
+        return _error('Invalid page_size')
+
+    # Cursor pagination (?cursor=): keyset on the sort column + id, no COUNT(*)
+    if 'cursor' in request.GET:
+        if sort_by == 'relevance' and search_query:
+            return _error('Cursor pagination is not available for relevance sorting')
+        field, descending = BLOG_CURSOR_ORDERINGS.get(sort_by, BLOG_CURSOR_ORDERINGS['newest'])
+        try:
+            query, to_page = CursorPaginator(blogs, field, descending, page_size).page_query(request.GET.get('cursor'))
+        except InvalidCursor as e:
+            return _error(str(e))
+        page = to_page((yield Fetch(query)))
+
+        page_blogs = page.object_list
+        meta = {
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.previous_cursor,
+            'page_size': page_size,
+        }
+        # Totals cost a full COUNT(*), so they are opt-in here
+        if request.GET.get('with_total') == 'true':
+            total = yield Count(blogs)
+            meta['total_blogs'] = total
+            meta['total_pages'] = max(1, -(-total // page_size))
+    else:
+        # Pagination; the count is taken up front so the paginator never queries.
+        # get_page() turns a bad or out of range ?page= into the first / last page.
+        paginator = Paginator(blogs, page_size)
+        paginator.count = yield Count(blogs)
+        page_obj = paginator.get_page(request.GET.get('page', 1))
+
+        page_blogs = yield Fetch(page_obj.object_list)
+        meta = {
+            'total_pages': paginator.num_pages,
+            'current_page': page_obj.number,
+            'total_blogs': paginator.count,
+        }
+
+    # The viewer's likes and the sharded counters are part of the validator
+    context = {'request': request}
+    page_ids = [blog.id for blog in page_blogs]
+    if 'liked' in fields and request.user.is_authenticated:
+        context['liked_ids'] = yield Call(liked_blog_ids, request.user, page_ids, afunc=aliked_blog_ids)
+    if 'stats' in fields:
+        context['sharded'] = yield Call(sharded_totals, page_ids, afunc=asharded_totals)
+
+    # Unchanged page: answer 304 before serializing anything
+    etag = blog_list_validators(
+        page_blogs, meta, request.user, selection, context.get('liked_ids'), context.get('sharded'),
+    )
+    not_modified = conditional_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    serializer = BlogListSerializer(page_blogs, many=True, context=context, **selection)
+    data = {**meta, 'blogs': serializer.data}
+
+    response = Response(data)
+    if cache_key:
+        yield Call(cache_blog_list, cache_key, (data, etag))
+        response['X-Cache'] = 'MISS'
+    return set_validators(response, etag)
+
+
+# Comment cursor and public stats of the detail payload, from what
+# for_detail() / recent_comments() loaded plus the unflushed counters
+def add_detail_extras(data, blog, fields, sharded):
+    # Only the newest comments are embedded; continue with /comments/?cursor=
+    if 'comments' in fields:
+        embedded = list(blog.comments.all())
+        data['comments_next_cursor'] = None
+        if embedded and blog.comment_count > len(embedded):
+            data['comments_next_cursor'] = comment_paginator(None, 'newest', 0).cursor_for(embedded[-1])
+
+    # Always include public stats
+    if 'stats' in fields:
+        stats = getattr(blog, 'stats', None)
+        data['stats'] = {
+            "views": (stats.views if stats else 0) + sharded.get('views', 0) + view_counter.pending(blog.id),
+            "likes": (stats.likes if stats else 0) + sharded.get('likes', 0),
+            "shares": (stats.shares if stats else 0) + sharded.get('shares', 0),
+            "comments": blog.comment_count,
+        }
+
+
+# ! Blog detail
+def blog_detail(request, blog_id):
+    # One row decides visibility, the conditional GET validators and the
+    # payload; only the selected relations are joined
+    selection = field_selection(request)
+    fields = BlogSerializer.selected_fields(**selection)
+    rows = yield Fetch(Blog.objects.alive().for_detail(fields).filter(id=blog_id)[:1])
+    if not rows:
+        return _not_found(Blog)
+    blog = rows[0]
+    user = request.user
+    is_author = user.is_authenticated and user.id == blog.author_id
+
+    if not blog.is_published:
+        # Hide unpublished blog from public
+        if not (is_author or (user.is_authenticated and user.is_admin)):
+            return _error('Blog not published yet', status.HTTP_403_FORBIDDEN)
+
+    # Count no. of times post get viewed (buffered, see blog/counters.py)
+    if not is_author:
+        yield Call(view_counter.record, blog.id, afunc=view_counter.arecord)
+
+    context = {'request': request}
+    if 'liked' in fields:
+        context['liked_ids'] = yield Call(liked_blog_ids, user, [blog.id], afunc=aliked_blog_ids)
+    if {'stats', 'likes'} & fields:
+        context['sharded'] = yield Call(sharded_totals, [blog.id], afunc=asharded_totals)
+
+    etag = blog_detail_validators(blog, user, selection, context.get('liked_ids'), context.get('sharded'))
+    not_modified = conditional_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    if 'comments' in fields:
+        lookups = [recent_comments(settings.BLOG_DETAIL_COMMENT_LIMIT)]
+        yield Call(prefetch_related_objects, [blog], *lookups, afunc=aprefetch_related_objects)
+    data = BlogSerializer(blog, context=context, **selection).data
+    add_detail_extras(data, blog, fields, context.get('sharded', {}).get(blog.id, {}))
+    return set_validators(Response(data), etag)
+
+
+# ! Blog comments
+def blog_comments(request, blog_id):
+    if not (yield Fetch(Blog.objects.filter(id=blog_id, deleted_at__isnull=True).values_list('id', flat=True)[:1])):
+        return _not_found(Blog)
+
+    # Live comments only (exclude soft-deleted)
+    selection = field_selection(request)
+    comments = Comment.objects.filter(blog_id=blog_id, deleted_at__isnull=True)
+    if 'author' in CommentSerializer.selected_fields(**selection):
+        comments = comments.select_related('author')
+
+    if 'cursor' not in request.GET and 'since' not in request.GET:
+        # Legacy flat list of every comment
+        items = yield Fetch(comments)
+        return Response(CommentSerializer(items, many=True, **selection).data)
+
+    try:
+        page_size = page_size_param(request.GET, 20, MAX_COMMENT_PAGE_SIZE)
+    except ValueError:
+        return _error('Invalid page_size')
+    since = comment_since_paginator(comments, page_size)
+
+    # ?since=<token>: only comments newer than the token, oldest first, so
+    # clients can poll; the returned `since` is the token for the next poll
+    if 'since' in request.GET:
+        token = request.GET.get('since')
+        try:
+            query, to_page = since.page_query(token)
+        except InvalidCursor as e:
+            return _error(str(e))
+        page = to_page((yield Fetch(query)))
+        items = page.object_list
+        return Response({
+            'comments': CommentSerializer(items, many=True, **selection).data,
+            'since': since.cursor_for(items[-1]) if items else token,
+            'has_more': page.next_cursor is not None,
+        })
+
+    # ?cursor=: keyset pages on (created_at, id), newest or oldest first
+    sort_by = request.GET.get('sort', 'newest')
+    if sort_by not in COMMENT_CURSOR_ORDERINGS:
+        sort_by = 'newest'
+    try:
+        query, to_page = comment_paginator(comments, sort_by, page_size).page_query(request.GET.get('cursor'))
+    except InvalidCursor as e:
+        return _error(str(e))
+    page = to_page((yield Fetch(query)))
+
+    items = page.object_list
+    if sort_by == 'newest' and not request.GET.get('cursor'):
+        latest = items[0] if items else None
+    else:
+        newest = yield Fetch(comments.order_by('-created_at', '-id')[:1])
+        latest = newest[0] if newest else None
+    return Response({
+        'comments': CommentSerializer(items, many=True, **selection).data,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.previous_cursor,
+        'page_size': page_size,
+        'since': since.cursor_for(latest) if latest else '',
+    })
+
+
+# ! Categories
+def category_list(request):
+    categories = yield Fetch(Category.objects.all())
+    return Response(CategorySerializer(categories, many=True).data)
@@ -0,0 +1,133 @@
+import datetime
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# ! Token revocation
+# Refresh tokens are checked against an in-process Bloom filter of the jtis
+# blacklisted and not yet expired; only a possible hit goes to the database.
+#  - tokens blacklisted by this process are added at once;
+#  - other processes' revocations are pulled in every
+#    TOKEN_REVOCATION_SYNC_INTERVAL seconds (0 always asks the database);
+#  - the filter is rebuilt every TOKEN_REVOCATION_REBUILD_INTERVAL seconds so
+#    expired and pruned tokens drop out and the false positive rate stays low.
+# `manage.py prune_tokens` deletes expired outstanding/blacklisted tokens.
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    # Double hashing over one 128-bit digest
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def _live_blacklist():
+    return BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+
+
+class RevocationFilter:
+    # Rows blacklisted this long before a sync are read again, so transactions
+    # that committed late are not missed
+    SYNC_OVERLAP = datetime.timedelta(seconds=60)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._bloom = None
+        self._built_at = self._synced_at = 0.0
+        self._synced_since = None
+
+    def _rebuild(self):
+        blacklist = _live_blacklist()
+        capacity = max(blacklist.count() * 2, settings.TOKEN_REVOCATION_MIN_CAPACITY)
+        bloom = BloomFilter(capacity, settings.TOKEN_REVOCATION_ERROR_RATE)
+        synced_since = timezone.now()
+        last_id = 0
+        while True:
+            chunk = list(blacklist.filter(id__gt=last_id).order_by('id').values_list('id', 'token__jti')[:5000])
+            if not chunk:
+                break
+            for _, jti in chunk:
+                bloom.add(jti)
+            last_id = chunk[-1][0]
+        self._bloom = bloom
+        self._built_at = self._synced_at = time.monotonic()
+        self._synced_since = synced_since
+
+    def _sync(self):
+        synced_since = timezone.now()
+        recent = _live_blacklist().filter(blacklisted_at__gte=self._synced_since - self.SYNC_OVERLAP)
+        for jti in recent.values_list('token__jti', flat=True):
+            self._bloom.add(jti)
+        self._synced_at = time.monotonic()
+        self._synced_since = synced_since
+
+    # False means certainly not blacklisted (as of the last sync)
+    def might_be_revoked(self, jti):
+        if settings.TOKEN_REVOCATION_SYNC_INTERVAL <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self._bloom is None or now - self._built_at >= settings.TOKEN_REVOCATION_REBUILD_INTERVAL:
+                self._rebuild()
+            elif now - self._synced_at >= settings.TOKEN_REVOCATION_SYNC_INTERVAL:
+                self._sync()
+            return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+
+revocation_filter = RevocationFilter()
+
+
+class RevocableRefreshToken(RefreshToken):
+    def check_blacklist(self):
+        if revocation_filter.might_be_revoked(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        revocation_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
+
+
+# Delete expired outstanding tokens (and, by cascade, their blacklist rows).
+# Tokens expire roughly in id order, so walking ids stops early in each chunk.
+def prune_expired_tokens(chunk_size=1000):
+    pruned = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+            .order_by('id').values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return pruned
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        pruned += len(ids)
@@ -0,0 +1,125 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .counters import compact_shards
+from .models import Blog, BlogStats, DailyBlogStats, DailyCategoryStats, DailySiteStats, User
+
+# ! Daily rollups
+# admin_stats reads these small per-day tables instead of scanning users,
+# blogs and stats on every dashboard load.
+#  - signups / new blogs / publications are recounted for a short window of
+#    recent days (the whole history with --backfill);
+#  - view / like / share deltas are the growth of each BlogStats row since its
+#    rolled_* snapshot, attributed to the day of the rollup.
+COUNTERS = ('views', 'likes', 'shares')
+SITE_COUNTS = (
+    ('signups', User.objects.all(), 'date_joined'),
+    ('blogs_created', Blog.objects.all(), 'created_at'),
+    ('publications', Blog.objects.filter(is_published=True), 'publish_at'),
+)
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def _upsert(model, rows, unique_fields, update_fields):
+    options = {'update_conflicts': True, 'update_fields': update_fields}
+    if connection.features.supports_update_conflicts_with_target:
+        options['unique_fields'] = unique_fields
+    model.objects.bulk_create(rows, **options)
+
+
+# Add deltas to one rollup row; concurrent rollups may touch the same row
+def _add(model, lookup, deltas):
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**increments)
+
+
+def earliest_day():
+    firsts = [
+        queryset.order_by(column).values_list(column, flat=True).first()
+        for _, queryset, column in SITE_COUNTS
+    ]
+    firsts = [timezone.localdate(value) for value in firsts if value is not None]
+    return min(firsts) if firsts else timezone.localdate()
+
+
+def rollup_site(since, until=None):
+    until = until or timezone.localdate()
+    counts = defaultdict(dict)
+    for field, queryset, column in SITE_COUNTS:
+        rows = (
+            queryset.filter(**{f'{column}__gte': _start_of(since)})
+            .annotate(day=TruncDate(column)).order_by().values('day').annotate(count=Count('id'))
+        )
+        for row in rows:
+            counts[row['day']][field] = row['count']
+
+    days = [since + datetime.timedelta(days=n) for n in range((until - since).days + 1)]
+    fields = [field for field, _, _ in SITE_COUNTS]
+    _upsert(
+        DailySiteStats,
+        [DailySiteStats(date=day, **{field: counts[day].get(field, 0) for field in fields}) for day in days],
+        ['date'], fields,
+    )
+    return len(days)
+
+
+def rollup_counters(day=None, chunk_size=1000):
+    day = day or timezone.localdate()
+    if settings.BLOG_COUNTER_SHARDS > 1:
+        compact_shards()
+
+    drifted = BlogStats.objects.exclude(
+        views=F('rolled_views'), likes=F('rolled_likes'), shares=F('rolled_shares')
+    )
+    rolled, last_id = 0, 0
+    while True:
+        ids = list(drifted.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            # Locked so increments landing meanwhile wait for the next rollup
+            chunk = list(BlogStats.objects.select_for_update().filter(id__in=ids).order_by('id'))
+            categories = dict(Blog.objects.filter(id__in=[s.blog_id for s in chunk]).values_list('id', 'category_id'))
+            daily = {row.blog_id: row for row in DailyBlogStats.objects.filter(date=day, blog_id__in=categories)}
+            site = dict.fromkeys(COUNTERS, 0)
+            by_category = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+            new_rows = []
+
+            for stats in chunk:
+                deltas = {field: getattr(stats, field) - getattr(stats, f'rolled_{field}') for field in COUNTERS}
+                row = daily.get(stats.blog_id)
+                if row is None:
+                    new_rows.append(DailyBlogStats(date=day, blog_id=stats.blog_id, **deltas))
+                else:
+                    for field, delta in deltas.items():
+                        setattr(row, field, getattr(row, field) + delta)
+                for field, delta in deltas.items():
+                    site[field] += delta
+                    setattr(stats, f'rolled_{field}', getattr(stats, field))
+                    if categories.get(stats.blog_id):
+                        by_category[categories[stats.blog_id]][field] += delta
+
+            DailyBlogStats.objects.bulk_create(new_rows)
+            DailyBlogStats.objects.bulk_update(list(daily.values()), list(COUNTERS))
+            for category_id, deltas in by_category.items():
+                _add(DailyCategoryStats, {'date': day, 'category_id': category_id}, deltas)
+            _add(DailySiteStats, {'date': day}, site)
+            BlogStats.objects.bulk_update(chunk, [f'rolled_{field}' for field in COUNTERS])
+        rolled += len(chunk)
+        last_id = ids[-1]
+    return rolled
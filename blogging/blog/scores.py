@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BlogStats, Comment
+
+# ! Ranking scores
+# popularity: weighted engagement counters
+# trending:   popularity decayed by age, popularity / (age_hours + 2) ^ gravity
+# Both are stored on BlogStats and refreshed in bulk, so sort=popular and
+# sort=trending read an index instead of aggregating on every request.
+
+
+def popularity_score(views, likes, shares, comments):
+    weights = settings.BLOG_SCORE_WEIGHTS
+    return (
+        views * weights['views'] + likes * weights['likes']
+        + shares * weights['shares'] + comments * weights['comments']
+    )
+
+
+def trending_score(popularity, published_at, now):
+    age_hours = max(0.0, (now - published_at).total_seconds() / 3600) if published_at else 0.0
+    return popularity / (age_hours + 2) ** settings.BLOG_TRENDING_GRAVITY
+
+
+def refresh_scores(chunk_size=1000, now=None):
+    now = now or timezone.now()
+    live_comments = (
+        Comment.objects.filter(blog=OuterRef('blog_id'), deleted_at__isnull=True)
+        .order_by().values('blog').annotate(count=Count('id')).values('count')
+    )
+    refreshed, last_id = 0, 0
+    while True:
+        chunk = list(
+            BlogStats.objects.filter(id__gt=last_id)
+            .select_related('blog')
+            .only('id', 'views', 'likes', 'shares', 'blog__publish_at', 'blog__created_at')
+            .annotate(comment_count=Coalesce(Subquery(live_comments), 0))
+            .order_by('id')[:chunk_size]
+        )
+        if not chunk:
+            break
+        for stats in chunk:
+            stats.popularity_score = popularity_score(stats.views, stats.likes, stats.shares, stats.comment_count)
+            stats.trending_score = trending_score(
+                stats.popularity_score, stats.blog.publish_at or stats.blog.created_at, now
+            )
+            stats.scores_updated_at = now
+        BlogStats.objects.bulk_update(chunk, ['popularity_score', 'trending_score', 'scores_updated_at'])
+        refreshed += len(chunk)
+        last_id = chunk[-1].id
+    return refreshed
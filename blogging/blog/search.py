@@ -0,0 +1,132 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from .models import Blog, BlogSearchDocument
+
+# Longer queries are truncated; each term is one index probe
+MAX_TERMS = 12
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+# ! Search backends
+# Every backend reads from BlogSearchDocument (one row per live blog). The
+# migration that creates it adds the vendor specific inverted index:
+# an InnoDB FULLTEXT index on MySQL, an FTS5 table kept in sync by triggers
+# on SQLite.
+class SearchBackend:
+    def search(self, queryset, terms):
+        raise NotImplementedError
+
+    def optimize(self):
+        pass
+
+    def index(self, blogs):
+        live, removed = [], []
+        for blog in blogs:
+            (removed if blog.deleted_at else live).append(blog)
+
+        if removed:
+            BlogSearchDocument.objects.filter(blog__in=[b.pk for b in removed]).delete()
+        if live:
+            documents = [
+                BlogSearchDocument(
+                    blog_id=blog.pk,
+                    title=blog.title,
+                    content=blog.content,
+                    category=blog.category.name if blog.category_id else '',
+                )
+                for blog in live
+            ]
+            options = {'update_conflicts': True, 'update_fields': ['title', 'content', 'category']}
+            if connection.features.supports_update_conflicts_with_target:
+                options['unique_fields'] = ['blog']
+            BlogSearchDocument.objects.bulk_create(documents, **options)
+
+    def rebuild(self, chunk_size=1000):
+        BlogSearchDocument.objects.filter(blog__deleted_at__isnull=False).delete()
+        indexed, last_id = 0, 0
+        while True:
+            chunk = list(
+                Blog.objects.alive().filter(id__gt=last_id)
+                .select_related('category').order_by('id')[:chunk_size]
+            )
+            if not chunk:
+                break
+            self.index(chunk)
+            indexed += len(chunk)
+            last_id = chunk[-1].id
+        self.optimize()
+        return indexed
+
+
+class MySQLSearchBackend(SearchBackend):
+    MATCH = "MATCH (title, content, category) AGAINST (%s IN {} MODE)"
+
+    def search(self, queryset, terms):
+        required = ' '.join(f'+{term}*' for term in terms)
+        matches = BlogSearchDocument.objects.filter(
+            RawSQL(self.MATCH.format('BOOLEAN'), [required], output_field=BooleanField())
+        )
+        rank = BlogSearchDocument.objects.filter(blog=OuterRef('pk')).annotate(
+            rank=RawSQL(self.MATCH.format('NATURAL LANGUAGE'), [' '.join(terms)], output_field=FloatField())
+        ).values('rank')
+        return queryset.filter(id__in=matches.values('blog')).annotate(
+            search_rank=Coalesce(Subquery(rank), Value(0.0))
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    # bm25() weights per column: title, content, category
+    RANK = "SELECT -bm25(blog_search_fts, 10.0, 1.0, 5.0) FROM blog_search_fts WHERE blog_search_fts MATCH %s AND rowid = blog_id"
+
+    def search(self, queryset, terms):
+        expression = ' '.join(f'"{term}"*' for term in terms)
+        matches = RawSQL("SELECT rowid FROM blog_search_fts WHERE blog_search_fts MATCH %s", [expression])
+        rank = BlogSearchDocument.objects.filter(blog=OuterRef('pk')).annotate(
+            rank=RawSQL(self.RANK, [expression], output_field=FloatField())
+        ).values('rank')
+        return queryset.filter(id__in=matches).annotate(
+            search_rank=Coalesce(Subquery(rank), Value(0.0))
+        )
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO blog_search_fts(blog_search_fts) VALUES('rebuild')")
+
+
+class FallbackSearchBackend(SearchBackend):
+    # No full-text index on this database: substring match, no ranking
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(content__icontains=term) | Q(category__name__icontains=term)
+            )
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+BACKENDS = {
+    'mysql': MySQLSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend():
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)()
+
+
+def search_blogs(queryset, query):
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return get_search_backend().search(queryset, terms)
+
+
+def index_blogs(blogs):
+    get_search_backend().index(blogs)
@@ -1,10 +1,12 @@
 from rest_framework import serializers
-from .models import User,Category,Blog,Comment,BlogStats
+from .models import User,Category,Blog,Comment,BlogStats,BlogQuerySet
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth import get_user_model, password_validation, authenticate
 from rest_framework.serializers import ValidationError
 from django.conf import settings
+from .likes import liked_blog_ids
+from .revocation import RevocableRefreshToken
 
 User=get_user_model()
 
@@ -18,8 +20,66 @@ def validate_image(image):
         raise ValidationError('File too large. Maximum size allowed is 5MB.')
     return image
     
+# ! Sparse fieldsets (?fields=id,title,author.username / ?omit=comments)
+def field_selection(request):
+    selection = {}
+    for param in ('fields', 'omit'):
+        value = request.query_params.get(param) if request else None
+        if value:
+            selection[param] = [name.strip() for name in value.split(',') if name.strip()]
+    return selection
+
+
+def _split_selection(names):
+    top, nested = set(), {}
+    for name in names:
+        head, _, rest = name.partition('.')
+        if rest:
+            nested.setdefault(head, []).append(rest)
+        else:
+            top.add(head)
+    return top, nested
+
+
+class SparseFieldsMixin:
+    # fields / omit are lists of field names; dotted names reach nested serializers
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None or omit is not None:
+            self.select_fields(fields, omit)
+
+    def select_fields(self, fields=None, omit=None):
+        nested_selection = {}
+        if fields is not None:
+            top, nested = _split_selection(fields)
+            keep = top | set(nested)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+            for name, names in nested.items():
+                if name not in top:
+                    nested_selection.setdefault(name, {})['fields'] = names
+        if omit is not None:
+            top, nested = _split_selection(omit)
+            for name in top:
+                self.fields.pop(name, None)
+            for name, names in nested.items():
+                nested_selection.setdefault(name, {})['omit'] = names
+
+        for name, selection in nested_selection.items():
+            field = self.fields.get(name)
+            field = getattr(field, 'child', field)
+            if isinstance(field, SparseFieldsMixin):
+                field.select_fields(**selection)
+
+    # Top-level names a selection keeps, so views can skip joins/prefetches for the rest
+    @classmethod
+    def selected_fields(cls, fields=None, omit=None):
+        return set(cls(fields=fields, omit=omit).fields)
+
+
 # ! User serializer
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_admin = serializers.SerializerMethodField()
     profile_picture = serializers.SerializerMethodField()
 
@@ -71,15 +131,8 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if identifier and password:
-            # Try to authenticate by username first, then email
-            user = authenticate(username=identifier, password=password)
-            if not user:
-                try:
-                    user_obj = User.objects.get(email=identifier)
-                    user = authenticate(username=user_obj.username, password=password)
-                except User.DoesNotExist:
-                    user = None
-
+            # Username or email, one lookup and one hash (blog/backends.py)
+            user = authenticate(self.context.get('request'), username=identifier, password=password)
             if not user:
                 raise serializers.ValidationError("Invalid credentials", code='authorization')
         else:
@@ -88,6 +141,10 @@ class LoginSerializer(serializers.Serializer):
         attrs['user'] = user
         return attrs
     
+# ! Token refresh (blacklist checks through blog/revocation.py)
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RevocableRefreshToken
+
 # ! Forgot Password 
 class PasswordResetSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -110,7 +167,7 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description']
 
 # ! Comment serializer
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)  
 
     class Meta:
@@ -124,9 +181,32 @@ class BlogStatsSerializer(serializers.ModelSerializer):
         model = BlogStats
         fields = ['views', 'likes', 'shares']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for field, delta in sharded_deltas(self, instance.blog_id).items():
+            if field in data:
+                data[field] += delta
+        return data
+
+# Counter deltas still held in BlogStatsShard rows; views pass
+# context['sharded'] (from sharded_totals) for the blogs they serialize
+def sharded_deltas(serializer, blog_id):
+    return serializer.context.get('sharded', {}).get(blog_id, {})
+
+# `liked` for the requesting user. Views pass context['liked_ids'] (from
+# liked_blog_ids) so a whole page costs one query; otherwise one per blog.
+def liked_by_viewer(serializer, obj):
+    liked_ids = serializer.context.get('liked_ids')
+    if liked_ids is not None:
+        return obj.pk in liked_ids
+    request = serializer.context.get('request')
+    if request and request.user.is_authenticated:
+        return obj.pk in liked_blog_ids(request.user, [obj.pk])
+    return False
+
 # ! Blog Serializer
 
-class BlogSerializer(serializers.ModelSerializer):
+class BlogSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     category_name = serializers.CharField(write_only=True)
@@ -135,6 +215,7 @@ class BlogSerializer(serializers.ModelSerializer):
     image_url= serializers.SerializerMethodField()
     image = serializers.ImageField(required=False, allow_null=True)
     liked = serializers.SerializerMethodField()
+    likes = serializers.SerializerMethodField()
     current_user = serializers.SerializerMethodField()
     is_admin = serializers.SerializerMethodField()
     
@@ -143,23 +224,26 @@ class BlogSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'content', 'author', 'category', 'category_name','image_url','image','liked','likes',"is_published","publish_at","created_at","deleted_at","updated_at","stats","comments",'current_user', 'is_admin']
         read_only_fields = ['author', 'category',"created_at","deleted_at","updated_at"]
 
+    # Resolves to the Category itself; batch writes pass the categories they
+    # already loaded as context['categories'] (name -> Category)
     def validate_category_name(self, value):
-        try:
-            category = Category.objects.get(name=value)
-        except Category.DoesNotExist:
+        categories = self.context.get('categories')
+        if categories is not None:
+            category = categories.get(value)
+        else:
+            category = Category.objects.filter(name=value).first()
+        if category is None:
             raise serializers.ValidationError("Category does not exist. Only admins can create new categories.")
-        return value
+        return category
 
     def create(self, validated_data):
-        category_name = validated_data.pop('category_name')
-        category = Category.objects.get(name=category_name)
+        category = validated_data.pop('category_name')
         blog = Blog.objects.create(category=category, **validated_data)
         return blog
 
     def update(self, instance, validated_data):
-        category_name = validated_data.pop('category_name', None)
-        if category_name:
-            category = Category.objects.get(name=category_name)
+        category = validated_data.pop('category_name', None)
+        if category:
             instance.category = category
 
         for attr, value in validated_data.items():
@@ -173,15 +257,13 @@ class BlogSerializer(serializers.ModelSerializer):
         return "https://via.placeholder.com/150"
     
     def get_likes(self, obj):
+        likes = sharded_deltas(self, obj.pk).get('likes', 0)
         if hasattr(obj, 'stats'):
-            return obj.stats.likes
-        return 0
+            return obj.stats.likes + likes
+        return likes
 
     def get_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return False
-        return False  
+        return liked_by_viewer(self, obj)
 
     def get_current_user(self, obj):
         request = self.context.get('request')
@@ -193,4 +275,40 @@ class BlogSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return request.user.is_staff
-        return False  
\ No newline at end of file
+        return False
+
+# ! Blog list serializer (lightweight projection for list endpoints)
+class BlogListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = UserSerializer(read_only=True)
+    category = CategorySerializer(read_only=True)
+    stats = BlogStatsSerializer(read_only=True)
+    excerpt = serializers.SerializerMethodField()
+    comment_count = serializers.SerializerMethodField()
+    image_url = serializers.SerializerMethodField()
+    liked = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Blog
+        fields = ['id', 'title', 'excerpt', 'author', 'category', 'image_url', "is_published", "publish_at", "created_at", "updated_at", "stats", "comment_count", "liked"]
+
+    def get_excerpt(self, obj):
+        # Annotated by Blog.objects.for_list(); fall back to the full content otherwise
+        excerpt = getattr(obj, 'excerpt', None)
+        if excerpt is None:
+            excerpt = obj.content[:BlogQuerySet.EXCERPT_LENGTH]
+        return excerpt
+
+    def get_comment_count(self, obj):
+        count = getattr(obj, 'comment_count', None)
+        if count is None:
+            count = obj.comments.filter(deleted_at__isnull=True).count()
+        return count
+
+    def get_liked(self, obj):
+        return liked_by_viewer(self, obj)
+
+    def get_image_url(self, obj):
+        if obj.image:
+            return f"{settings.NGROK_URL}{obj.image.url}"
+        return "https://via.placeholder.com/150"
+
@@ -6,6 +6,8 @@ from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from django.urls import reverse
 from blog.serializers import (
     UserSerializer, RegisterSerializer,
@@ -13,12 +15,51 @@ from blog.serializers import (
     CategorySerializer, CommentSerializer, BlogStatsSerializer,
     BlogSerializer, validate_image, LoginSerializer
 )
-from .models import User, Blog, Category, Comment, BlogStats
+from .counters import ViewCounter, compact_shards, increment_counter, view_counter
+from .likes import like_blog, unlike_blog
+from .pagination import MAX_BLOG_PAGE_SIZE, encode_cursor
+from .models import User, Blog, Category, Comment, BlogStats, BlogSearchDocument, BlogStatsShard, DailyBlogStats, BlogEngagementBucket, OutboundEmail
+from .engagement import compact_engagement, record_engagement
+from .hashers import MIN_ITERATIONS, ConfigurablePBKDF2PasswordHasher
+from .revocation import RevocableRefreshToken, revocation_filter
+from .mail import queue_mail, send_queued_mail
+from . import async_views
+import asyncio
+import datetime
+import json
+import smtplib
 import tempfile
+import time
+from unittest import mock
+from io import StringIO
+from django.core.management import call_command
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.cache import cache
+from django.test import override_settings, RequestFactory
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, Sum
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
 from PIL import Image
 
 User = get_user_model()
 
+
+# Views counted by other tests stay out of this one, and no flusher thread
+# writes to the test database behind its back
+def clear_pending_views(test):
+    def clear():
+        with view_counter._lock:
+            view_counter._pending.clear()
+    clear()
+    test.addCleanup(clear)
+    patcher = mock.patch.object(view_counter, '_start_flusher')
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
 # ------------------- MODEL TESTS -------------------
 class UserModelTest(TestCase):
     def test_create_user(self):
@@ -315,14 +356,45 @@ class BlogDetailAPITestCase(APITestCase):
             category=cls.category, is_published=True
         )
 
+    def setUp(self):
+        clear_pending_views(self)
+
     def test_blog_detail_increases_view_count(self):
         url = reverse('blog-detail', args=[self.blog.id])
         initial_views = self.blog.stats.views
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        view_counter.flush()
         self.blog.stats.refresh_from_db()
         self.assertEqual(self.blog.stats.views, initial_views + 1)
 
+    @override_settings(BLOG_DETAIL_COMMENT_LIMIT=2)
+    def test_detail_query_count_and_comment_cap(self):
+        readers = [
+            User.objects.create_user(username=f"reader{i}", email=f"reader{i}@example.com", password="pass123")
+            for i in range(3)
+        ]
+        comments = [Comment.objects.create(blog=self.blog, author=reader, content="Hi") for reader in readers]
+        comments[-1].soft_delete()
+
+        # Blog + author + category + stats + comment aggregates, then the capped comments
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('blog-detail', args=[self.blog.id]))
+        self.assertEqual([c['id'] for c in response.data['comments']], [comments[1].id, comments[0].id])
+        self.assertEqual(response.data['stats']['comments'], 2)
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse('blog-detail', args=[self.blog.id]), {'omit': 'comments'})
+
+    @override_settings(BLOG_VIEW_FLUSH_INTERVAL=3600)
+    def test_pending_views_shown_before_flush(self):
+        url = reverse('blog-detail', args=[self.blog.id])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.data['stats']['views'], 2)
+        self.blog.stats.refresh_from_db()
+        self.assertEqual(self.blog.stats.views, 0)
+
 
 # ------------------- COMMENT CREATE + DELETE TESTS -------------------
 class CommentAPITestCase(APITestCase):
@@ -387,6 +459,8 @@ class CategoryAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 # ------------------- UPLOAD PROFILE PICTURE -------------------
+# Uploads go to a scratch MEDIA_ROOT, never into the repository's media/
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class UploadProfilePictureTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -422,3 +496,1384 @@ class UploadProfilePictureTest(TestCase):
         image = self.create_test_image()
         response = self.client.put(self.url, {'profile_picture': image}, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+# ------------------- CURSOR PAGINATION TESTS -------------------
+class BlogCursorPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="pager", email="pager@example.com", password="pass123"
+        )
+        cls.category = Category.objects.create(name="Paging")
+        now = timezone.now()
+        # Two posts share a publish_at and a title to exercise the id tie-breaker
+        cls.blogs = [
+            Blog.objects.create(
+                title=f"Post {i // 2}", content="Body", author=cls.user, category=cls.category,
+                is_published=True, publish_at=now - timezone.timedelta(hours=i // 2 + 1)
+            )
+            for i in range(7)
+        ]
+        cls.url = reverse('blogs-list-create')
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, sort):
+        ids, cursor = [], ''
+        while cursor is not None:
+            response = self.client.get(self.url, {'sort': sort, 'page_size': 3, 'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('total_blogs', response.data)
+            ids += [b['id'] for b in response.data['blogs']]
+            cursor = response.data['next_cursor']
+        return ids
+
+    def test_cursor_walk_matches_ordering(self):
+        expected = list(Blog.objects.order_by('-publish_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk('newest'), expected)
+        expected = list(Blog.objects.order_by('title', 'id').values_list('id', flat=True))
+        self.assertEqual(self.walk('title_asc'), expected)
+
+    def test_prev_cursor_returns_previous_page(self):
+        first = self.client.get(self.url, {'sort': 'oldest', 'page_size': 3, 'cursor': ''})
+        self.assertIsNone(first.data['prev_cursor'])
+        second = self.client.get(self.url, {'sort': 'oldest', 'page_size': 3, 'cursor': first.data['next_cursor']})
+        back = self.client.get(self.url, {'sort': 'oldest', 'page_size': 3, 'cursor': second.data['prev_cursor']})
+        self.assertEqual([b['id'] for b in back.data['blogs']], [b['id'] for b in first.data['blogs']])
+        self.assertIsNone(back.data['prev_cursor'])
+
+    def test_invalid_or_mismatched_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        first = self.client.get(self.url, {'sort': 'newest', 'page_size': 3, 'cursor': ''})
+        response = self.client.get(self.url, {'sort': 'title_asc', 'cursor': first.data['next_cursor']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tampered_cursor_values_are_rejected(self):
+        for value in ('garbage', {'dt': 'garbage'}, {'dt': '2024-01-01T00:00:00'}, [1]):
+            cursor = encode_cursor({'k': 'publish_at:desc', 'v': value, 'id': 1})
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        cursor = encode_cursor({'k': 'stats__popularity_score:desc', 'v': 'NaN', 'id': 1})
+        response = self.client.get(self.url, {'sort': 'popular', 'cursor': cursor})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        cursor = encode_cursor({'k': 'publish_at:desc', 'v': None, 'id': 2 ** 70})
+        self.assertEqual(self.client.get(self.url, {'cursor': cursor}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_page_size_is_clamped(self):
+        for size in ('0', '-1'):
+            response = self.client.get(self.url, {'page_size': size, 'cursor': ''})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['blogs']), 1)
+            response = self.client.get(self.url, {'page_size': size})
+            self.assertEqual(len(response.data['blogs']), 1)
+        response = self.client.get(self.url, {'page_size': 10 ** 6, 'cursor': ''})
+        self.assertEqual(response.data['page_size'], MAX_BLOG_PAGE_SIZE)
+        for params in ({'page_size': 'abc'}, {'page_size': 'abc', 'cursor': ''}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'page': 'abc'}).data['current_page'], 1)
+
+    def test_totals_are_opt_in(self):
+        response = self.client.get(self.url, {'page_size': 3, 'cursor': '', 'with_total': 'true'})
+        self.assertEqual(response.data['total_blogs'], 7)
+        self.assertEqual(response.data['total_pages'], 3)
+
+
+# ------------------- LIST PROJECTION TESTS -------------------
+class BlogListProjectionTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="lister", email="lister@example.com", password="pass123"
+        )
+        cls.category = Category.objects.create(name="Listing")
+        for i in range(6):
+            blog = Blog.objects.create(
+                title=f"Listed {i}", content="x" * 500, author=cls.user, category=cls.category,
+                is_published=True, publish_at=timezone.now()
+            )
+            Comment.objects.create(blog=blog, author=cls.user, content="First")
+            Comment.objects.create(blog=blog, author=cls.user, content="Gone", deleted_at=timezone.now())
+        cls.url = reverse('blogs-list-create')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_shape(self):
+        response = self.client.get(self.url)
+        blog = response.data['blogs'][0]
+        self.assertEqual(blog['comment_count'], 1)
+        self.assertEqual(len(blog['excerpt']), 200)
+        self.assertEqual(blog['author']['username'], "lister")
+        self.assertEqual(blog['category']['name'], "Listing")
+        self.assertIn('likes', blog['stats'])
+        self.assertNotIn('content', blog)
+        self.assertNotIn('comments', blog)
+
+    def test_query_count_independent_of_page_size(self):
+        # COUNT(*) + one page query, whatever the page size
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'page_size': 2})
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'page_size': 6})
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'page_size': 6, 'cursor': ''})
+
+
+# ------------------- EXPLAIN COMMAND TESTS -------------------
+class ExplainBlogQueriesCommandTest(TestCase):
+    def test_prints_a_plan_per_query(self):
+        user = User.objects.create_user(username="explainer", email="explain@example.com", password="pass123")
+        Blog.objects.create(title="Plan", content="Body", author=user, is_published=True, publish_at=timezone.now())
+        out = StringIO()
+        call_command('explain_blog_queries', stdout=out)
+        for name in ("list newest", "list title_asc", "list mine", "detail", "comments"):
+            self.assertIn(f"== {name}", out.getvalue())
+
+
+# ------------------- SEARCH TESTS -------------------
+class BlogSearchTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="searcher", email="search@example.com", password="pass123"
+        )
+        cls.python = Category.objects.create(name="Python")
+        cls.travel = Category.objects.create(name="Travel")
+        now = timezone.now()
+        cls.in_title = Blog.objects.create(
+            title="Django performance tips", content="Indexes and caching.", author=cls.user,
+            category=cls.travel, is_published=True, publish_at=now - timezone.timedelta(days=2)
+        )
+        cls.in_content = Blog.objects.create(
+            title="Weekend notes", content="Some thoughts on django signals.", author=cls.user,
+            category=cls.travel, is_published=True, publish_at=now - timezone.timedelta(days=1)
+        )
+        cls.in_category = Blog.objects.create(
+            title="Generators", content="Lazy iteration.", author=cls.user,
+            category=cls.python, is_published=True, publish_at=now
+        )
+        cls.url = reverse('blogs-list-create')
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [b['id'] for b in response.data['blogs']]
+
+    def test_matches_title_content_and_category(self):
+        self.assertCountEqual(self.ids(search="django"), [self.in_title.id, self.in_content.id])
+        self.assertEqual(self.ids(search="python"), [self.in_category.id])
+        self.assertEqual(self.ids(search="perf"), [self.in_title.id])
+
+    def test_relevance_sort_prefers_title_matches(self):
+        self.assertEqual(self.ids(search="django", sort="relevance"), [self.in_title.id, self.in_content.id])
+
+    def test_index_follows_edits_and_soft_delete(self):
+        self.in_content.title = "Django weekend notes"
+        self.in_content.save()
+        self.assertEqual(self.ids(search="weekend django"), [self.in_content.id])
+        self.in_content.soft_delete()
+        self.assertEqual(self.ids(search="django"), [self.in_title.id])
+
+    def test_category_rename_is_reindexed(self):
+        self.python.name = "Snakes"
+        self.python.save()
+        self.assertEqual(self.ids(search="snakes"), [self.in_category.id])
+        self.assertEqual(self.ids(search="python"), [])
+
+    def test_rebuild_command(self):
+        BlogSearchDocument.objects.all().delete()
+        self.assertEqual(self.ids(search="django"), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn("Indexed 3 blogs", out.getvalue())
+        self.assertCountEqual(self.ids(search="django"), [self.in_title.id, self.in_content.id])
+
+
+# ------------------- ANONYMOUS LIST CACHE TESTS -------------------
+class BlogListCacheTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="cacher", email="cacher@example.com", password="pass123"
+        )
+        cls.category = Category.objects.create(name="Caching")
+        Blog.objects.create(
+            title="Cached", content="Body", author=cls.user, category=cls.category,
+            is_published=True, publish_at=timezone.now()
+        )
+        cls.url = reverse('blogs-list-create')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hit_skips_the_database(self):
+        first = self.client.get(self.url, {'sort': 'newest', 'page': '1'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        # Same normalized query: defaults filled in, category case folded
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {'page_size': '10'})
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(self.client.get(self.url, {'category': 'caching'})['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url, {'category': 'CACHING '})['X-Cache'], 'HIT')
+
+    def test_blog_and_category_writes_invalidate(self):
+        self.client.get(self.url)
+        blog = Blog.objects.create(
+            title="Fresh", content="Body", author=self.user, category=self.category,
+            is_published=True, publish_at=timezone.now()
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['total_blogs'], 2)
+
+        blog.soft_delete()
+        self.assertEqual(self.client.get(self.url).data['total_blogs'], 1)
+
+        self.client.get(self.url)
+        self.category.name = "Renamed"
+        self.category.save()
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('X-Cache'))
+
+    def test_hit_and_miss_counters(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.get(self.url)
+        from blog.cache import blog_list_cache_stats
+        self.assertEqual(blog_list_cache_stats(), {'hits': 2, 'misses': 1, 'hit_ratio': 0.6667})
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}
+            with override_settings(CACHES=backend):
+                self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+                self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+                Blog.objects.create(title="Another", content="Body", author=self.user)
+                self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+
+
+# ------------------- CONDITIONAL GET TESTS -------------------
+class ConditionalGetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username="etagger", email="etag@example.com", password="pass123"
+        )
+        cls.reader = User.objects.create_user(
+            username="poller", email="poll@example.com", password="pass123"
+        )
+        cls.blog = Blog.objects.create(
+            title="Polled", content="Body", author=cls.author,
+            is_published=True, publish_at=timezone.now()
+        )
+        cls.detail_url = reverse('blog-detail', args=[cls.blog.id])
+        cls.list_url = reverse('blogs-list-create')
+
+    def setUp(self):
+        cache.clear()
+        clear_pending_views(self)
+
+    def test_detail_if_none_match(self):
+        first = self.client.get(self.detail_url)
+        etag = first['ETag']
+        # Validator row only: the view is buffered and nothing is serialized
+        with self.assertNumQueries(1):
+            second = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second['ETag'], etag)
+
+        Comment.objects.create(blog=self.blog, author=self.reader, content="New")
+        third = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(third.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(third['ETag'], etag)
+
+    def test_detail_etag_tracks_stats_and_viewer(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        BlogStats.objects.filter(blog=self.blog).update(likes=F('likes') + 1)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        etag = self.client.get(self.detail_url)['ETag']
+        self.client.force_authenticate(self.reader)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_no_last_modified(self):
+        # Likes and shares have no timestamp, so only the ETag can vouch for them
+        response = self.client.get(self.detail_url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertNotIn('Last-Modified', self.client.get(self.list_url))
+        BlogStats.objects.filter(blog=self.blog).update(shares=F('shares') + 1)
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etags_track_the_viewers_likes(self):
+        # One like in, one out: the counters match but the reader's `liked` changed
+        stats = BlogStats.objects.get(blog=self.blog)
+        like_blog(stats, self.author)
+        self.client.force_authenticate(self.reader)
+        detail_etag = self.client.get(self.detail_url)['ETag']
+        list_etag = self.client.get(self.list_url)['ETag']
+        like_blog(stats, self.reader)
+        unlike_blog(stats, self.author)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['liked'])
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['blogs'][0]['liked'])
+
+    def test_views_still_counted_on_304(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        view_counter.flush()
+        self.blog.stats.refresh_from_db()
+        self.assertEqual(self.blog.stats.views, 2)
+
+    def test_list_if_none_match(self):
+        self.client.force_authenticate(self.reader)
+        etag = self.client.get(self.list_url)['ETag']
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Blog.objects.filter(id=self.blog.id).update(title="Renamed", updated_at=timezone.now())
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cached_anonymous_list_answers_304(self):
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+
+# ------------------- SPARSE FIELDSET TESTS -------------------
+class SparseFieldsetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="sparse", email="sparse@example.com", password="pass123"
+        )
+        cls.category = Category.objects.create(name="Minimal")
+        cls.blogs = [
+            Blog.objects.create(
+                title=f"Sparse {i}", content="Body", author=cls.user, category=cls.category,
+                is_published=True, publish_at=timezone.now()
+            )
+            for i in range(3)
+        ]
+        for blog in cls.blogs:
+            Comment.objects.create(blog=blog, author=cls.user, content="Hi")
+        cls.list_url = reverse('blogs-list-create')
+
+    def setUp(self):
+        cache.clear()
+        clear_pending_views(self)
+
+    def test_serializer_fields_and_omit(self):
+        blog = self.blogs[0]
+        data = BlogSerializer(blog, fields=['id', 'title', 'author.username']).data
+        self.assertEqual(set(data), {'id', 'title', 'author'})
+        self.assertEqual(data['author'], {'username': 'sparse'})
+
+        data = BlogSerializer(blog, omit=['comments', 'stats', 'author.email']).data
+        self.assertNotIn('comments', data)
+        self.assertNotIn('stats', data)
+        self.assertNotIn('email', data['author'])
+
+        data = CommentSerializer(blog.comments.all(), many=True, fields=['id', 'content']).data
+        self.assertEqual(set(data[0]), {'id', 'content'})
+        self.assertEqual(set(UserSerializer(self.user, fields=['id']).data), {'id'})
+
+    def test_list_fields_drop_joins(self):
+        response = self.client.get(self.list_url, {'fields': 'id,title,author.username', 'cursor': ''})
+        blog = response.data['blogs'][0]
+        self.assertEqual(set(blog), {'id', 'title', 'author'})
+        self.assertEqual(set(blog['author']), {'username'})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.list_url, {'fields': 'id,title', 'cursor': ''})
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('blog_blogstats', sql)
+        self.assertNotIn('blog_comment', sql)
+        self.assertNotIn('blog_user', sql)
+
+    def test_detail_omit_drops_prefetch(self):
+        url = reverse('blog-detail', args=[self.blogs[0].id])
+        full = self.client.get(url)
+        self.assertIn('comments', full.data)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'omit': 'comments,stats'})
+        self.assertNotIn('comments', response.data)
+        self.assertNotIn('stats', response.data)
+        # Just the detail row: no comment prefetch
+        self.assertEqual(len(queries), 1)
+        self.assertNotEqual(response['ETag'], full['ETag'])
+
+    def test_comment_list_fields(self):
+        url = reverse('blog-comments', kwargs={'blog_id': self.blogs[0].id})
+        response = self.client.get(url, {'fields': 'content'})
+        self.assertEqual(response.data[0], {'content': 'Hi'})
+
+
+# ------------------- POPULAR / TRENDING SORT TESTS -------------------
+class BlogScoreSortTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="ranker", email="ranker@example.com", password="pass123"
+        )
+        now = timezone.now()
+        cls.old_hit = Blog.objects.create(
+            title="Old hit", content="Body", author=cls.user,
+            is_published=True, publish_at=now - timezone.timedelta(days=30)
+        )
+        cls.fresh = Blog.objects.create(
+            title="Fresh", content="Body", author=cls.user,
+            is_published=True, publish_at=now - timezone.timedelta(hours=1)
+        )
+        cls.quiet = Blog.objects.create(
+            title="Quiet", content="Body", author=cls.user,
+            is_published=True, publish_at=now - timezone.timedelta(days=2)
+        )
+        BlogStats.objects.filter(blog=cls.old_hit).update(views=1000, likes=50, shares=10)
+        BlogStats.objects.filter(blog=cls.fresh).update(views=40, likes=5)
+        Comment.objects.create(blog=cls.fresh, author=cls.user, content="Nice")
+        cls.url = reverse('blogs-list-create')
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, **params):
+        return [b['id'] for b in self.client.get(self.url, params).data['blogs']]
+
+    def test_refresh_command_computes_scores(self):
+        out = StringIO()
+        call_command('refresh_blog_scores', stdout=out)
+        self.assertIn("Refreshed scores for 3 blogs", out.getvalue())
+        stats = BlogStats.objects.get(blog=self.fresh)
+        # 40 views + 5 likes * 3 + 1 comment * 4
+        self.assertEqual(stats.popularity_score, 59)
+        self.assertIsNotNone(stats.scores_updated_at)
+
+    def test_popular_and_trending_orderings(self):
+        call_command('refresh_blog_scores', stdout=StringIO())
+        self.assertEqual(self.ids(sort='popular'), [self.old_hit.id, self.fresh.id, self.quiet.id])
+        self.assertEqual(self.ids(sort='trending'), [self.fresh.id, self.old_hit.id, self.quiet.id])
+
+    def test_trending_cursor_pages(self):
+        call_command('refresh_blog_scores', stdout=StringIO())
+        first = self.client.get(self.url, {'sort': 'trending', 'page_size': 2, 'cursor': ''})
+        second = self.client.get(self.url, {'sort': 'trending', 'page_size': 2, 'cursor': first.data['next_cursor']})
+        ids = [b['id'] for b in first.data['blogs'] + second.data['blogs']]
+        self.assertEqual(ids, [self.fresh.id, self.old_hit.id, self.quiet.id])
+
+
+# ------------------- SCHEDULED PUBLISHING TESTS -------------------
+class ScheduledPublishingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="scheduler", email="scheduler@example.com", password="pass123"
+        )
+        self.url = reverse('blogs-list-create')
+
+    def schedule(self, title, delta):
+        return Blog.objects.create(
+            title=title, content="Body", author=self.user,
+            is_published=True, publish_at=timezone.now() + delta
+        )
+
+    def test_future_post_stays_unpublished(self):
+        blog = self.schedule("Later", timezone.timedelta(hours=1))
+        self.assertFalse(blog.is_published)
+        self.assertEqual(self.client.get(self.url).data['total_blogs'], 0)
+
+    def test_command_publishes_due_posts(self):
+        due = self.schedule("Due", timezone.timedelta(hours=1))
+        later = self.schedule("Later", timezone.timedelta(days=1))
+        self.client.get(self.url)
+        # The publish time passes without the row being saved again
+        Blog.objects.filter(id=due.id).update(publish_at=timezone.now() - timezone.timedelta(minutes=1))
+
+        out = StringIO()
+        call_command('publish_scheduled_blogs', stdout=out)
+        self.assertIn(f"Published 1 blogs. Next due: {later.publish_at.isoformat()}", out.getvalue())
+        self.assertTrue(Blog.objects.get(id=due.id).is_published)
+        self.assertFalse(Blog.objects.get(id=later.id).is_published)
+        # The anonymous list cache is invalidated
+        self.assertEqual([b['id'] for b in self.client.get(self.url).data['blogs']], [due.id])
+
+
+# ------------------- BATCH API TESTS -------------------
+class BlogBatchAPITest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="importer", email="importer@example.com", password="pass123"
+        )
+        cls.other = User.objects.create_user(
+            username="bystander", email="bystander@example.com", password="pass123"
+        )
+        cls.travel = Category.objects.create(name="Travel")
+        cls.food = Category.objects.create(name="Food")
+        cls.url = reverse('blogs-batch')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+        self.mine = Blog.objects.create(
+            title="Mine", content="Body", author=self.user, category=self.travel, is_published=True
+        )
+        self.doomed = Blog.objects.create(title="Doomed", content="Body", author=self.user, category=self.travel)
+
+    def create_op(self, title, category="Travel"):
+        return {'op': 'create', 'data': {'title': title, 'content': f"{title} body", 'category_name': category}}
+
+    def test_mixed_batch_is_applied(self):
+        response = self.client.post(self.url, {'operations': [
+            self.create_op("Imported", "Food"),
+            {'op': 'update', 'id': self.mine.id, 'data': {'title': "Renamed", 'category_name': "Food"}},
+            {'op': 'delete', 'id': self.doomed.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        statuses = [(r['op'], r['status']) for r in response.data['results']]
+        self.assertEqual(statuses, [('create', 'created'), ('update', 'updated'), ('delete', 'deleted')])
+
+        created = Blog.objects.get(id=response.data['results'][0]['id'])
+        self.assertEqual((created.author, created.category), (self.user, self.food))
+        self.assertTrue(BlogStats.objects.filter(blog=created).exists())
+        self.assertTrue(BlogSearchDocument.objects.filter(blog=created, category="Food").exists())
+        self.mine.refresh_from_db()
+        self.assertEqual((self.mine.title, self.mine.category), ("Renamed", self.food))
+        self.assertIsNotNone(Blog.objects.get(id=self.doomed.id).deleted_at)
+        self.assertFalse(BlogSearchDocument.objects.filter(blog=self.doomed).exists())
+
+    def test_invalid_item_rejects_whole_batch(self):
+        foreign = Blog.objects.create(title="Foreign", content="Body", author=self.other)
+        response = self.client.post(self.url, {'operations': [
+            self.create_op("Fine"),
+            self.create_op("Bad category", "Nope"),
+            {'op': 'delete', 'id': foreign.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], ['skipped', 'error', 'error'])
+        self.assertIn('category_name', results[1]['errors'])
+        self.assertFalse(Blog.objects.filter(title="Fine").exists())
+        self.assertIsNone(Blog.objects.get(id=foreign.id).deleted_at)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        def count(size):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, {
+                    'operations': [self.create_op(f"Post {size}-{i}") for i in range(size)]
+                }, format='json')
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        self.assertEqual(count(2), count(20))
+
+
+# ------------------- VIEW COUNTER TESTS -------------------
+class ViewCounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username="counted", email="counted@example.com", password="pass123")
+        cls.blogs = [Blog.objects.create(title=f"Blog {i}", content="Body", author=user) for i in range(3)]
+
+    @override_settings(BLOG_VIEW_FLUSH_INTERVAL=3600)
+    def test_flush_writes_one_update_per_distinct_delta(self):
+        counter = ViewCounter()
+        first, second, third = self.blogs
+        for blog in (first, second, third, third):
+            counter.record(blog.id)
+        self.assertEqual(counter.pending(third.id), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(counter.flush(), 4)
+        self.assertEqual(sum(q['sql'].startswith('UPDATE "blog_blogstats"') for q in queries), 2)
+        self.assertEqual(counter.pending(third.id), 0)
+        views = dict(BlogStats.objects.values_list('blog_id', 'views'))
+        self.assertEqual([views[b.id] for b in self.blogs], [1, 1, 2])
+        # Nothing left to apply twice
+        self.assertEqual(counter.flush(), 0)
+
+    @override_settings(BLOG_VIEW_FLUSH_INTERVAL=3600)
+    def test_flush_creates_missing_stats(self):
+        counter = ViewCounter()
+        BlogStats.objects.filter(blog=self.blogs[0]).delete()
+        counter.record(self.blogs[0].id)
+        counter.flush()
+        self.assertEqual(BlogStats.objects.get(blog=self.blogs[0]).views, 1)
+
+    @override_settings(BLOG_VIEW_FLUSH_INTERVAL=0)
+    def test_zero_interval_writes_through(self):
+        counter = ViewCounter()
+        counter.record(self.blogs[1].id)
+        self.assertEqual(BlogStats.objects.get(blog=self.blogs[1]).views, 1)
+
+    @override_settings(BLOG_VIEW_FLUSH_INTERVAL=3600)
+    def test_record_starts_one_background_flusher(self):
+        counter = ViewCounter()
+        with mock.patch('blog.counters.threading.Thread') as thread:
+            thread.return_value.is_alive.return_value = True
+            counter.record(self.blogs[0].id)
+            counter.record(self.blogs[1].id)
+        thread.assert_called_once_with(target=counter._flush_periodically, name='view-counter', daemon=True)
+        self.assertTrue(thread.return_value.start.called)
+        self.assertEqual(BlogStats.objects.get(blog=self.blogs[0]).views, 0)
+
+    @override_settings(BLOG_VIEW_FLUSH_INTERVAL=3600)
+    def test_flusher_writes_views_of_an_idle_worker(self):
+        counter = ViewCounter()
+        with mock.patch.object(counter, '_start_flusher'):
+            counter.record(self.blogs[2].id)
+
+        class Stop(Exception):
+            pass
+
+        with mock.patch('blog.counters.time.sleep', side_effect=[None, Stop]) as sleep, \
+                mock.patch('blog.counters.connection') as conn:
+            with self.assertRaises(Stop):
+                counter._flush_periodically()
+        sleep.assert_called_with(3600)
+        self.assertTrue(conn.close.called)
+        self.assertEqual(BlogStats.objects.get(blog=self.blogs[2]).views, 1)
+
+    @override_settings(BLOG_VIEW_FLUSH_INTERVAL=0)
+    def test_flush_errors_are_logged_and_retried(self):
+        counter = ViewCounter()
+        with mock.patch('blog.counters.add_to_counters', side_effect=DatabaseError("gone away")), \
+                self.assertLogs('blog.counters', 'ERROR'):
+            counter.record(self.blogs[0].id)
+        self.assertEqual(counter.pending(self.blogs[0].id), 1)
+        counter.record(self.blogs[0].id)
+        self.assertEqual(counter.pending(self.blogs[0].id), 0)
+        self.assertEqual(BlogStats.objects.get(blog=self.blogs[0]).views, 2)
+
+
+# ------------------- COMMENT PAGINATION TESTS -------------------
+class CommentPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="chatty", email="chatty@example.com", password="pass123"
+        )
+        cls.blog = Blog.objects.create(
+            title="Busy thread", content="Body", author=cls.user, is_published=True
+        )
+        now = timezone.now()
+        # Two comments share a timestamp to exercise the id tie-breaker
+        cls.comments = [
+            Comment.objects.create(
+                blog=cls.blog, author=cls.user, content=f"Comment {i}",
+                created_at=now - timezone.timedelta(minutes=10 - i // 2)
+            )
+            for i in range(7)
+        ]
+        cls.url = reverse('blog-comments', args=[cls.blog.id])
+
+    def setUp(self):
+        clear_pending_views(self)
+
+    def walk(self, sort):
+        ids, cursor = [], ''
+        while cursor is not None:
+            response = self.client.get(self.url, {'sort': sort, 'page_size': 3, 'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [c['id'] for c in response.data['comments']]
+            cursor = response.data['next_cursor']
+        return ids
+
+    def test_cursor_pages_cover_every_comment(self):
+        oldest = [c.id for c in self.comments]
+        self.assertEqual(self.walk('oldest'), oldest)
+        self.assertEqual(self.walk('newest'), oldest[::-1])
+
+    def test_since_returns_only_newer_comments(self):
+        since = self.client.get(self.url, {'cursor': ''}).data['since']
+        empty = self.client.get(self.url, {'since': since})
+        self.assertEqual((empty.data['comments'], empty.data['since']), ([], since))
+
+        fresh = Comment.objects.create(blog=self.blog, author=self.user, content="Fresh")
+        response = self.client.get(self.url, {'since': since})
+        self.assertEqual([c['id'] for c in response.data['comments']], [fresh.id])
+        self.assertFalse(response.data['has_more'])
+        self.assertEqual(self.client.get(self.url, {'since': response.data['since']}).data['comments'], [])
+
+    def test_cursor_from_another_sort_is_rejected(self):
+        cursor = self.client.get(self.url, {'sort': 'oldest', 'page_size': 3, 'cursor': ''}).data['next_cursor']
+        response = self.client.get(self.url, {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_legacy_flat_list_without_params(self):
+        self.assertEqual(len(self.client.get(self.url).data), 7)
+
+    @override_settings(BLOG_DETAIL_COMMENT_LIMIT=3)
+    def test_detail_embeds_capped_comments_with_continuation(self):
+        detail = self.client.get(reverse('blog-detail', args=[self.blog.id])).data
+        embedded = [c['id'] for c in detail['comments']]
+        rest = self.client.get(self.url, {'cursor': detail['comments_next_cursor'], 'page_size': 10}).data
+        self.assertEqual(embedded + [c['id'] for c in rest['comments']], [c.id for c in self.comments][::-1])
+
+
+# ------------------- LIKE TESTS -------------------
+class BlogLikeTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username="liked_author", email="liked_author@example.com", password="pass123"
+        )
+        cls.fan = User.objects.create_user(
+            username="fan", email="fan@example.com", password="pass123"
+        )
+        cls.blogs = [
+            Blog.objects.create(title=f"Likeable {i}", content="Body", author=cls.author, is_published=True)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        clear_pending_views(self)
+        self.client.force_authenticate(self.fan)
+
+    def test_like_and_unlike_are_idempotent(self):
+        url = reverse('blog-like', args=[self.blogs[0].id])
+        for _ in range(2):
+            response = self.client.post(url)
+            self.assertEqual((response.status_code, response.data), (200, {'likes': 1, 'liked': True}))
+        for _ in range(2):
+            response = self.client.delete(url)
+            self.assertEqual((response.status_code, response.data), (200, {'likes': 0, 'liked': False}))
+        self.assertFalse(self.blogs[0].stats.liked_users.exists())
+
+    def test_author_cannot_like(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.post(reverse('blog-like', args=[self.blogs[0].id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_liked_state_for_a_page_in_one_query(self):
+        self.client.post(reverse('blog-like', args=[self.blogs[1].id]))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blogs-list-create'))
+        liked = {b['id']: b['liked'] for b in response.data['blogs']}
+        self.assertEqual(liked, {self.blogs[0].id: False, self.blogs[1].id: True, self.blogs[2].id: False})
+        self.assertEqual(sum('liked_users' in q['sql'] for q in queries), 1)
+
+        detail = self.client.get(reverse('blog-detail', args=[self.blogs[1].id]))
+        self.assertTrue(detail.data['liked'])
+
+
+# ------------------- LIKE RECONCILIATION TESTS -------------------
+class ReconcileLikesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="counted_author", email="ca@example.com", password="pass123")
+        cls.fan = User.objects.create_user(username="counted_fan", email="cf@example.com", password="pass123")
+        cls.blog = Blog.objects.create(title="Drifting", content="Body", author=cls.author)
+        cls.blog.stats.liked_users.add(cls.fan)
+
+    def test_reports_and_fixes_drift(self):
+        BlogStats.objects.filter(blog=self.blog).update(likes=5)
+
+        out = StringIO()
+        call_command('reconcile_likes', '--dry-run', stdout=out)
+        self.assertIn(f"Blog {self.blog.id}: likes=5, liked users=1", out.getvalue())
+        self.assertEqual(BlogStats.objects.get(blog=self.blog).likes, 5)
+
+        out = StringIO()
+        call_command('reconcile_likes', stdout=out)
+        self.assertIn("Checked 1 blogs, fixed 1 drifted like counters.", out.getvalue())
+        self.assertEqual(BlogStats.objects.get(blog=self.blog).likes, 1)
+
+
+# ------------------- SHARDED COUNTER TESTS -------------------
+@override_settings(BLOG_COUNTER_SHARDS=4)
+class ShardedCounterTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="viral", email="viral@example.com", password="pass123")
+        cls.fan = User.objects.create_user(username="sharer", email="sharer@example.com", password="pass123")
+        cls.blog = Blog.objects.create(title="Viral", content="Body", author=cls.author, is_published=True)
+
+    def setUp(self):
+        clear_pending_views(self)
+        self.client.force_authenticate(self.fan)
+
+    def test_increments_land_in_shards_and_reads_sum_them(self):
+        for _ in range(3):
+            response = self.client.post(reverse('blog-share', args=[self.blog.id]))
+        self.assertEqual(response.data['shares'], 3)
+        self.assertEqual(self.client.post(reverse('blog-like', args=[self.blog.id])).data['likes'], 1)
+
+        self.assertEqual(BlogStats.objects.get(blog=self.blog).shares, 0)
+        self.assertEqual(sum(BlogStatsShard.objects.filter(blog=self.blog).values_list('shares', flat=True)), 3)
+        stats = self.client.get(reverse('blog-detail', args=[self.blog.id])).data['stats']
+        self.assertEqual((stats['likes'], stats['shares']), (1, 3))
+
+    def test_list_and_validators_include_shards(self):
+        detail_url = reverse('blog-detail', args=[self.blog.id])
+        list_url = reverse('blogs-list-create')
+        detail_etag = self.client.get(detail_url)['ETag']
+        list_etag = self.client.get(list_url)['ETag']
+        self.client.post(reverse('blog-like', args=[self.blog.id]))
+
+        detail = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
+        self.assertEqual((detail.data['likes'], detail.data['stats']['likes']), (1, 1))
+        listed = self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(listed.status_code, status.HTTP_200_OK)
+        self.assertEqual(listed.data['blogs'][0]['stats']['likes'], 1)
+        async_listed = async_to_sync(async_views.blogs_list_create)(
+            RequestFactory().get(list_url, HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.fan).access_token}")
+        )
+        self.assertEqual(json.loads(async_listed.content)['blogs'][0]['stats']['likes'], 1)
+
+    def test_compaction_can_be_limited_to_some_blogs(self):
+        other = Blog.objects.create(title="Other", content="Body", author=self.author, is_published=True)
+        for blog in (self.blog, other):
+            self.client.post(reverse('blog-share', args=[blog.id]))
+        self.assertEqual(compact_shards(blog_ids=[other.id]), 1)
+        self.assertEqual(BlogStats.objects.get(blog=other).shares, 1)
+        self.assertEqual(BlogStats.objects.get(blog=self.blog).shares, 0)
+        self.assertEqual(sum(BlogStatsShard.objects.filter(blog=self.blog).values_list('shares', flat=True)), 1)
+
+    def test_compaction_folds_shards_into_stats(self):
+        for _ in range(3):
+            self.client.post(reverse('blog-share', args=[self.blog.id]))
+        self.client.post(reverse('blog-like', args=[self.blog.id]))
+        self.client.delete(reverse('blog-like', args=[self.blog.id]))
+        self.client.post(reverse('blog-like', args=[self.blog.id]))
+
+        out = StringIO()
+        call_command('compact_counter_shards', stdout=out)
+        self.assertIn("Compacted counters of 1 blogs", out.getvalue())
+        stats = BlogStats.objects.get(blog=self.blog)
+        self.assertEqual((stats.likes, stats.shares), (1, 3))
+        self.assertFalse(BlogStatsShard.objects.exclude(likes=0, shares=0, views=0).exists())
+        # Nothing left to fold or to count twice
+        self.assertEqual(self.client.get(reverse('blog-detail', args=[self.blog.id])).data['stats']['shares'], 3)
+
+    def test_reconcile_accounts_for_shards(self):
+        self.client.post(reverse('blog-like', args=[self.blog.id]))
+        out = StringIO()
+        call_command('reconcile_likes', stdout=out)
+        self.assertIn("fixed 0 drifted", out.getvalue())
+
+
+# ------------------- DAILY ROLLUP TESTS -------------------
+class DailyRollupTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="boss", email="boss@example.com", password="pass123")
+        cls.author = User.objects.create_user(username="rolled", email="rolled@example.com", password="pass123")
+        cls.tech = Category.objects.create(name="Rollup tech")
+        cls.blog = Blog.objects.create(
+            title="Rolled", content="Body", author=cls.author, category=cls.tech, is_published=True
+        )
+        cls.draft = Blog.objects.create(title="Draft", content="Body", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def test_rollup_then_admin_stats(self):
+        BlogStats.objects.filter(blog=self.blog).update(views=10, likes=2, shares=1)
+        call_command('rollup_stats', stdout=StringIO())
+        # Only growth since the last rollup is added
+        BlogStats.objects.filter(blog=self.blog).update(views=15)
+        out = StringIO()
+        call_command('rollup_stats', stdout=out)
+        self.assertIn("rolled up counters of 1 blogs", out.getvalue())
+
+        today = timezone.localdate()
+        row = DailyBlogStats.objects.get(blog=self.blog, date=today)
+        self.assertEqual((row.views, row.likes, row.shares), (15, 2, 1))
+
+        response = self.client.get(reverse('admin-stats'), {'range': 'daily'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(
+            (data['total_users'], data['total_blogs'], data['total_views'], data['total_likes'], data['total_shares']),
+            (2, 2, 15, 2, 1),
+        )
+        self.assertEqual(data['users_by_range'], [{'period': today.strftime('%Y-%m-%d'), 'count': 2}])
+        self.assertEqual(data['blogs_by_range'], [{'period': today.strftime('%Y-%m-%d'), 'count': 1}])
+        self.assertIn({'name': "Rollup tech", 'total_likes': 2, 'total_shares': 1, 'total_views': 15}, data['category_stats'])
+        self.assertEqual(data['blog_stats'][0], {'title': "Rolled", 'likes_sum': 2, 'shares_sum': 1, 'views_sum': 15})
+
+    def test_admin_stats_reads_rollups_only(self):
+        call_command('rollup_stats', stdout=StringIO())
+        # Totals, two range series, categories, top blogs, next scheduled post
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('admin-stats'))
+        self.assertEqual(len(queries), 6)
+        self.assertFalse(any('"blog_user"' in q['sql'] for q in queries))
+
+    def test_admin_stats_cached_per_range(self):
+        response = self.client.get(reverse('admin-stats'), {'range': 'daily'})
+        self.assertEqual(response.data['data_age'], 0)
+        with self.assertNumQueries(0):
+            cached = self.client.get(reverse('admin-stats'), {'range': 'daily'})
+        self.assertEqual(cached.data['total_users'], response.data['total_users'])
+        self.assertIn('Age', cached)
+        # Other ranges are cached separately
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('admin-stats'), {'range': 'yearly'})
+        self.assertEqual(len(queries), 6)
+
+    @override_settings(ADMIN_STATS_CACHE_TIMEOUT=0)
+    def test_stale_copy_served_while_another_request_recomputes(self):
+        self.client.get(reverse('admin-stats'))
+        # Another request holds the recompute lock
+        cache.add('admin-stats:monthly:lock', 1, 30)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('admin-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cache.delete('admin-stats:monthly:lock')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('admin-stats'))
+        self.assertEqual(len(queries), 6)
+
+    @override_settings(ADMIN_STATS_CACHE_WAIT=0.2)
+    def test_cold_cache_waits_briefly_for_another_recompute(self):
+        cache.add('admin-stats:monthly:lock', 1, 30)
+        started = time.monotonic()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(len(queries), 6)
+        cache.delete('admin-stats:monthly:lock')
+
+
+# ------------------- ENGAGEMENT HISTORY TESTS -------------------
+class EngagementHistoryTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="charted", email="charted@example.com", password="pass123")
+        cls.reader = User.objects.create_user(username="sharer", email="sharer@example.com", password="pass123")
+        cls.blog = Blog.objects.create(title="Charted", content="Body", author=cls.author, is_published=True)
+
+    def buckets(self, granularity):
+        return sorted(
+            BlogEngagementBucket.objects.filter(granularity=granularity).values_list('event', 'count')
+        )
+
+    def test_counter_writes_add_to_hourly_buckets(self):
+        self.client.force_authenticate(self.reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('blog-share', args=[self.blog.id]))
+            self.client.post(reverse('blog-like', args=[self.blog.id]))
+            self.client.delete(reverse('blog-like', args=[self.blog.id]))
+            self.client.post(reverse('blog-like', args=[self.blog.id]))
+        self.assertEqual(self.buckets('hour'), [('likes', 1), ('shares', 1)])
+
+        response = self.client.get(reverse('blog-engagement', args=[self.blog.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        today = timezone.localdate().strftime('%Y-%m-%d')
+        self.assertEqual(response.data['series'], [{'period': today, 'views': 0, 'likes': 1, 'shares': 1}])
+
+    @override_settings(BLOG_COUNTER_SHARDS=4)
+    def test_history_is_written_after_the_counter_commits_per_shard(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for _ in range(20):
+                increment_counter(self.blog.id, 'shares')
+        # Nothing is written inside the counter transaction
+        self.assertFalse(BlogEngagementBucket.objects.exists())
+        for callback in callbacks:
+            callback()
+        shards = BlogEngagementBucket.objects.values_list('shard', flat=True)
+        self.assertEqual(set(shards), set(BlogStatsShard.objects.filter(blog=self.blog).values_list('shard', flat=True)))
+        self.assertEqual(sum(BlogEngagementBucket.objects.values_list('count', flat=True)), 20)
+
+        compact_engagement(now=timezone.now() + datetime.timedelta(days=settings.BLOG_ENGAGEMENT_HOURLY_DAYS + 1))
+        self.assertEqual(list(BlogEngagementBucket.objects.values_list('granularity', 'shard', 'count')), [('day', 0, 20)])
+
+    def test_compaction_keeps_totals(self):
+        now = timezone.now()
+        for days_ago in (0, 1, 5, 200, 201):
+            record_engagement('views', {self.blog.id: 2}, now=now - datetime.timedelta(days=days_ago))
+            record_engagement('views', {self.blog.id: 1}, now=now - datetime.timedelta(days=days_ago))
+
+        self.assertEqual(BlogEngagementBucket.objects.count(), 5)
+
+        compacted = compact_engagement(now=now)
+        self.assertEqual(compacted, 5)
+        counts = dict(
+            BlogEngagementBucket.objects.values_list('granularity').annotate(total=Sum('count')).order_by()
+        )
+        self.assertEqual(counts, {'hour': 6, 'day': 3, 'month': 6})
+        # Rows of one period are merged
+        self.assertEqual(BlogEngagementBucket.objects.filter(granularity='day').count(), 1)
+
+        response = self.client.get(reverse('blog-engagement', args=[self.blog.id]), {'range': 'yearly'})
+        self.assertEqual(sum(point['views'] for point in response.data['series']), 15)
+        since = (timezone.localdate() - datetime.timedelta(days=10)).isoformat()
+        response = self.client.get(reverse('blog-engagement', args=[self.blog.id]), {'range': 'yearly', 'since': since})
+        self.assertEqual(sum(point['views'] for point in response.data['series']), 9)
+
+        # A late write to a compacted period is added to its bucket
+        record_engagement('views', {self.blog.id: 4}, now=now - datetime.timedelta(days=5))
+        self.assertEqual(compact_engagement(now=now), 1)
+        self.assertEqual(BlogEngagementBucket.objects.get(granularity='day').count, 7)
+
+    def test_hidden_blog_and_bad_dates(self):
+        draft = Blog.objects.create(title="Hidden", content="Body", author=self.author)
+        response = self.client.get(reverse('blog-engagement', args=[draft.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('blog-engagement', args=[self.blog.id]), {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ------------------- STATS EXPORT TESTS -------------------
+@override_settings(STATS_EXPORT_CHUNK_SIZE=1)
+class StatsExportTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="exporter", email="exporter@example.com", password="pass123")
+        author = User.objects.create_user(username="exported", email="exported@example.com", password="pass123")
+        cls.tech = Category.objects.create(name="Export tech")
+        cls.blogs = [
+            Blog.objects.create(title=f"Export {i}", content="Body", author=author, category=cls.tech, is_published=True)
+            for i in range(3)
+        ]
+        for i, blog in enumerate(cls.blogs):
+            BlogStats.objects.filter(blog=blog).update(views=10 * (i + 1), likes=i, shares=1)
+        call_command('rollup_stats', stdout=StringIO())
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def export(self, dataset, fmt, **params):
+        response = self.client.get(reverse('stats-export', args=[dataset, fmt]), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_blog_csv_walks_every_chunk(self):
+        lines = self.export('blogs', 'csv', range='daily').splitlines()
+        self.assertEqual(lines[0], 'id,title,author_name,category_name,period,views,likes,shares')
+        today = timezone.localdate().strftime('%Y-%m-%d')
+        self.assertEqual(lines[1:], [
+            f'{blog.id},Export {i},exported,Export tech,{today},{10 * (i + 1)},{i},1'
+            for i, blog in enumerate(self.blogs)
+        ])
+
+    @override_settings(STATS_EXPORT_CHUNK_SIZE=2)
+    def test_blogs_and_categories_without_rollups_are_exported(self):
+        quiet = Blog.objects.create(title="Quiet", content="Body", author=self.blogs[0].author, is_published=True)
+        DailyBlogStats.objects.filter(blog=self.blogs[1]).delete()
+        empty = Category.objects.create(name="Empty")
+        lines = self.export('blogs', 'csv', range='daily').splitlines()
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], [str(b.id) for b in (*self.blogs, quiet)])
+        self.assertEqual(lines[2], f'{self.blogs[1].id},Export 1,exported,Export tech,,0,0,0')
+        self.assertEqual(lines[4], f'{quiet.id},Quiet,exported,,,0,0,0')
+        categories = [json.loads(line) for line in self.export('categories', 'ndjson').splitlines()]
+        self.assertEqual(categories[-1], {'id': empty.id, 'name': "Empty", 'period': None, 'views': 0, 'likes': 0, 'shares': 0})
+
+    def test_category_and_signup_ndjson(self):
+        categories = [json.loads(line) for line in self.export('categories', 'ndjson').splitlines()]
+        self.assertEqual(categories, [{
+            'id': self.tech.id, 'name': "Export tech", 'period': timezone.localdate().replace(day=1).strftime('%Y-%m-%d'),
+            'views': 60, 'likes': 3, 'shares': 3,
+        }])
+        signups = [json.loads(line) for line in self.export('signups', 'ndjson', range='yearly').splitlines()]
+        self.assertEqual([(row['signups'], row['publications']) for row in signups], [(2, 3)])
+
+    def test_admin_only_and_unknown_exports(self):
+        response = self.client.get(reverse('stats-export', args=['users', 'csv']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse('stats-export', args=['blogs', 'csv']))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+# ------------------- LOGIN TESTS -------------------
+@override_settings(PASSWORD_HASH_ITERATIONS=1000, PASSWORD_HASH_ALLOW_WEAK=True)
+class LoginHashingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="hashed", email="hashed@example.com", password="pass123")
+
+    def attempt(self, identifier, password):
+        serializer = LoginSerializer(data={'identifier': identifier, 'password': password})
+        encode = ConfigurablePBKDF2PasswordHasher.encode
+        with mock.patch.object(ConfigurablePBKDF2PasswordHasher, 'encode', autospec=True, side_effect=encode) as hashed:
+            with CaptureQueriesContext(connection) as queries:
+                valid = serializer.is_valid()
+        return valid, hashed.call_count, len(queries)
+
+    def test_every_attempt_hashes_once_after_one_lookup(self):
+        self.assertEqual(self.attempt("hashed@example.com", "pass123"), (True, 1, 1))
+        self.assertEqual(self.attempt("hashed", "pass123"), (True, 1, 1))
+        self.assertEqual(self.attempt("hashed@example.com", "wrong"), (False, 1, 1))
+        self.assertEqual(self.attempt("nobody", "pass123"), (False, 1, 1))
+
+    def test_username_wins_over_another_accounts_email(self):
+        owner = User.objects.create_user(username="clash@example.com", email="owner@example.com", password="mine123")
+        User.objects.create_user(username="other", email="clash@example.com", password="theirs123")
+        serializer = LoginSerializer(data={'identifier': "clash@example.com", 'password': "mine123"})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['user'], owner)
+
+    def test_inactive_users_cannot_log_in(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertFalse(self.attempt("hashed", "pass123")[0])
+
+    def test_hashes_are_only_upgraded(self):
+        hasher = ConfigurablePBKDF2PasswordHasher()
+        encoded = hasher.encode("pass123", hasher.salt(), iterations=MIN_ITERATIONS + 1)
+        User.objects.filter(pk=self.user.pk).update(password=encoded)
+        with override_settings(PASSWORD_HASH_ITERATIONS=MIN_ITERATIONS):
+            self.assertFalse(hasher.must_update(encoded))
+            self.assertTrue(self.attempt("hashed", "pass123")[0])
+        self.assertEqual(User.objects.get(pk=self.user.pk).password, encoded)
+        with override_settings(PASSWORD_HASH_ITERATIONS=MIN_ITERATIONS + 2):
+            self.assertTrue(hasher.must_update(encoded))
+
+    def test_weak_iterations_need_an_explicit_opt_in(self):
+        self.assertEqual(ConfigurablePBKDF2PasswordHasher().iterations, 1000)
+        with override_settings(PASSWORD_HASH_ALLOW_WEAK=False), self.assertRaises(ImproperlyConfigured):
+            ConfigurablePBKDF2PasswordHasher().iterations
+
+
+# ------------------- CACHED JWT USER TESTS -------------------
+class CachedJWTUserTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tokened", email="tokened@example.com", password="pass123")
+
+    def setUp(self):
+        cache.clear()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def me(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('current_user'))
+        return response, sum('"blog_user"' in q['sql'] for q in queries)
+
+    def test_repeated_requests_skip_the_user_query(self):
+        self.assertEqual(self.me()[1], 1)
+        response, user_queries = self.me()
+        self.assertEqual(response.data['username'], "tokened")
+        self.assertEqual(user_queries, 0)
+
+    def test_user_save_invalidates(self):
+        self.me()
+        user = User.objects.get(pk=self.user.pk)
+        user.username = "renamed"
+        user.save()
+        response, user_queries = self.me()
+        self.assertEqual((response.data['username'], user_queries), ("renamed", 1))
+
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.me()[0].status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+# ------------------- TOKEN REVOCATION TESTS -------------------
+class TokenRevocationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="rotating", email="rotating@example.com", password="pass123")
+
+    def setUp(self):
+        revocation_filter.reset()
+
+    def blacklist_queries(self, token):
+        with CaptureQueriesContext(connection) as queries:
+            try:
+                RevocableRefreshToken(token)
+                revoked = False
+            except TokenError:
+                revoked = True
+        return revoked, sum('token_blacklist_blacklistedtoken' in q['sql'] for q in queries)
+
+    def test_live_tokens_skip_the_database(self):
+        token = str(RevocableRefreshToken.for_user(self.user))
+        self.blacklist_queries(token)
+        self.assertEqual(self.blacklist_queries(token), (False, 0))
+
+    def test_rotated_token_is_rejected(self):
+        old = str(RevocableRefreshToken.for_user(self.user))
+        self.blacklist_queries(old)
+        response = self.client.post(reverse('token_refresh'), {'refresh': old}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.blacklist_queries(old), (True, 1))
+        response = self.client.post(reverse('token_refresh'), {'refresh': old}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocations_from_other_processes(self):
+        token = RevocableRefreshToken.for_user(self.user)
+        self.blacklist_queries(str(token))
+        # Blacklisted without going through this process's filter
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        with override_settings(TOKEN_REVOCATION_SYNC_INTERVAL=0):
+            self.assertEqual(self.blacklist_queries(str(token))[0], True)
+        revocation_filter._synced_at -= settings.TOKEN_REVOCATION_SYNC_INTERVAL
+        self.assertEqual(self.blacklist_queries(str(token))[0], True)
+
+    def test_prune_deletes_expired_tokens_in_batches(self):
+        expired = [RevocableRefreshToken.for_user(self.user) for _ in range(3)]
+        live = RevocableRefreshToken.for_user(self.user)
+        expired[0].blacklist()
+        OutstandingToken.objects.filter(jti__in=[t['jti'] for t in expired]).update(
+            expires_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+        out = StringIO()
+        call_command('prune_tokens', '--chunk-size', '2', stdout=out)
+        self.assertIn("Pruned 3 expired tokens", out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [live['jti']])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+# ------------------- OUTBOUND MAIL QUEUE TESTS -------------------
+class CountingEmailBackend(locmem.EmailBackend):
+    opened = 0
+
+    def open(self):
+        type(self).opened += 1
+        return super().open()
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+    def send_messages(self, messages):
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+
+class OutboundMailQueueTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="forgetful", email="forgetful@example.com", password="pass123")
+
+    def test_reset_request_only_queues(self):
+        response = self.client.post(reverse('password_reset'), {'email': "forgetful@example.com"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual((queued.to, queued.status), ("forgetful@example.com", OutboundEmail.QUEUED))
+
+        call_command('send_queued_mail', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("reset-password", mail.outbox[0].body)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, OutboundEmail.SENT)
+
+    @override_settings(EMAIL_BACKEND='blog.tests.CountingEmailBackend')
+    def test_batch_shares_one_connection(self):
+        for i in range(3):
+            queue_mail("Hello", "Body", [f"reader{i}@example.com"])
+        CountingEmailBackend.opened = 0
+        out = StringIO()
+        call_command('send_queued_mail', '--batch-size', '2', stdout=out)
+        self.assertIn("Sent 2 emails", out.getvalue())
+        self.assertEqual((CountingEmailBackend.opened, len(mail.outbox)), (1, 2))
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.QUEUED).count(), 1)
+
+    @override_settings(EMAIL_BACKEND='blog.tests.FailingEmailBackend', MAIL_QUEUE_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_give_up(self):
+        email = queue_mail("Hello", "Body", ["reader@example.com"])
+        self.assertEqual(send_queued_mail(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.QUEUED, 1))
+        self.assertIn("SMTPServerDisconnected", email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now() + datetime.timedelta(seconds=30))
+        # Not due yet
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        send_queued_mail()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.FAILED, 2))
+
+
+# ------------------- ASYNC VIEW TESTS -------------------
+class AsyncReadViewsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="awaited", email="awaited@example.com", password="pass123")
+        cls.admin = User.objects.create_user(username="async-admin", email="async-admin@example.com", password="pass123", is_admin=True)
+        cls.tech = Category.objects.create(name="Async tech")
+        cls.blogs = [
+            Blog.objects.create(title=f"Async {i}", content="Body " * 80, author=cls.author, category=cls.tech, is_published=True)
+            for i in range(3)
+        ]
+        for i in range(4):
+            Comment.objects.create(blog=cls.blogs[0], author=cls.author, content=f"Comment {i}")
+
+    def setUp(self):
+        cache.clear()
+        clear_pending_views(self)
+        self.factory = RequestFactory()
+        self.token = f"Bearer {RefreshToken.for_user(self.author).access_token}"
+
+    # The same GET through the DRF view and the async view
+    def both(self, view, url, params=None, **kwargs):
+        sync_response = self.client.get(url, params, HTTP_AUTHORIZATION=self.token)
+        cache.clear()
+        request = self.factory.get(url, params, HTTP_AUTHORIZATION=self.token)
+        async_response = async_to_sync(view)(request, **kwargs)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(json.loads(async_response.content), sync_response.json())
+        self.assertEqual(async_response.get('ETag'), sync_response.get('ETag'))
+        return async_response
+
+    def test_reads_match_the_sync_views(self):
+        blog = self.blogs[0]
+        self.both(async_views.blogs_list_create, reverse('blogs-list-create'), {'page_size': 2, 'page': 2})
+        self.both(async_views.blogs_list_create, reverse('blogs-list-create'), {'page_size': 2, 'page': 99})
+        self.both(async_views.blogs_list_create, reverse('blogs-list-create'), {'cursor': '', 'sort': 'title_asc'})
+        self.both(async_views.blog_detail, reverse('blog-detail', args=[blog.id]), blog_id=blog.id)
+        self.both(
+            async_views.blog_comments, reverse('blog-comments', args=[blog.id]),
+            {'cursor': '', 'page_size': 3}, blog_id=blog.id,
+        )
+        self.both(async_views.blog_comments, reverse('blog-comments', args=[blog.id]), {'since': ''}, blog_id=blog.id)
+        self.both(async_views.categories_list_create, reverse('categories-list-create'))
+
+    def test_errors_match_the_sync_views(self):
+        draft = Blog.objects.create(title="Async draft", content="Body", author=self.admin)
+        self.both(async_views.blog_detail, reverse('blog-detail', args=[draft.id]), blog_id=draft.id)
+        self.both(async_views.blog_detail, reverse('blog-detail', args=[999999]), blog_id=999999)
+        self.both(async_views.blogs_list_create, reverse('blogs-list-create'), {'cursor': 'bogus'})
+        self.token = "Bearer not-a-token"
+        response = self.both(async_views.blogs_list_create, reverse('blogs-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_anonymous_views_are_counted(self):
+        request = self.factory.get(reverse('blog-detail', args=[self.blogs[1].id]))
+        async_to_sync(async_views.blog_detail)(request, blog_id=self.blogs[1].id)
+        self.assertEqual(view_counter.pending(self.blogs[1].id), 1)
+
+    def test_other_methods_use_the_sync_views(self):
+        token = RefreshToken.for_user(self.admin).access_token
+        request = self.factory.post(
+            reverse('categories-list-create'), {'name': "Posted"}, content_type='application/json',
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        response = async_to_sync(async_views.categories_list_create)(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Category.objects.filter(name="Posted").exists())
+
+    def test_routes_swap_both_ways(self):
+        from .urls import urlpatterns
+        swapped = {p.name: p.callback for p in async_views.with_async_views(urlpatterns)}
+        self.assertIs(swapped['blog-detail'], async_views.blog_detail)
+        restored = {p.name: p.callback for p in async_views.with_async_views(urlpatterns, use_async=False)}
+        self.assertIs(restored['blog-detail'], async_views.views.blog_detail)
+        self.assertTrue(asyncio.iscoroutinefunction(swapped['blog-detail']))
@@ -1,5 +1,6 @@
+from django.conf import settings
 from django.urls import path
-from .views import register, logout, me, login_view, blogs_list_create, blog_detail, password_reset_request, password_reset_confirm, categories_list_create,category_detail,blog_comments,comment_detail, blog_like,blog_share,admin_stats, upload_profile_picture
+from .views import register, logout, me, login_view, blogs_list_create, blogs_batch, blog_detail, password_reset_request, password_reset_confirm, categories_list_create,category_detail,blog_comments,comment_detail, blog_like,blog_share,blog_engagement,admin_stats,stats_export, upload_profile_picture
 from rest_framework_simplejwt.views import TokenRefreshView
 
 
@@ -13,6 +14,7 @@ urlpatterns = [
     path('auth/reset-password-confirm/<uid>/<token>/', password_reset_confirm, name='password_reset_confirm'),
 
     path('blogs/', blogs_list_create, name='blogs-list-create'),
+    path('blogs/batch/', blogs_batch, name='blogs-batch'),
     path('blogs/<int:blog_id>/', blog_detail, name='blog-detail'),
 
     path('categories/', categories_list_create, name='categories-list-create'),
@@ -23,9 +25,16 @@ urlpatterns = [
 
     path('blogs/<int:blog_id>/like/', blog_like, name='blog-like'),
     path('blogs/<int:blog_id>/share/', blog_share, name='blog-share'),
+    path('blogs/<int:blog_id>/engagement/', blog_engagement, name='blog-engagement'),
 
     path('stats/', admin_stats, name='admin-stats'),
+    path('stats/export/<slug:dataset>.<slug:fmt>', stats_export, name='stats-export'),
 
     path('auth/upload-profile-picture/', upload_profile_picture, name='upload-profile-picture'),
     
-]
\ No newline at end of file
+]
+
+# Native async GETs for ASGI deployments (blog/async_views.py)
+if settings.BLOG_ASYNC_VIEWS:
+    from .async_views import with_async_views
+    urlpatterns = with_async_views(urlpatterns)
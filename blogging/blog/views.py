@@ -1,4 +1,5 @@
-from rest_framework_simplejwt.tokens import RefreshToken
+import datetime
+
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from rest_framework.decorators import api_view, permission_classes,parser_classes
@@ -7,24 +8,33 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.conf import settings
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import F
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.db import DatabaseError, OperationalError
 from rest_framework.permissions import IsAdminUser
-from django.db.models import Count
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncQuarter, TruncYear
 from django.db.models.functions import Coalesce
 
 
-from .models import User, Blog , Category, Comment, BlogStats
+from .models import User, Blog , Category, Comment, BlogStats, DailySiteStats
+from . import reads
+from .cache import blog_list_cache_stats, cached_admin_stats
+from .publishing import next_publish_due
+from .batch import apply_blog_batch
+from .counters import increment_counter, counter_value
+from .likes import like_blog, unlike_blog
+from .engagement import engagement_series
+from .export import EXPORT_DATASETS, EXPORT_FORMATS
+from .revocation import RevocableRefreshToken
+from .mail import queue_mail
 from django.db.models import Sum
 
-from .serializers import RegisterSerializer, UserSerializer,PasswordResetSerializer, PasswordResetConfirmSerializer, BlogSerializer, CategorySerializer, CommentSerializer, BlogStatsSerializer, LoginSerializer
+from .serializers import RegisterSerializer, UserSerializer,PasswordResetSerializer, PasswordResetConfirmSerializer, BlogSerializer, CategorySerializer, field_selection, CommentSerializer, BlogStatsSerializer, LoginSerializer
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -51,11 +61,11 @@ def register(request):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_view(request):
-    serializer = LoginSerializer(data=request.data)
+    serializer = LoginSerializer(data=request.data, context={'request': request})
     serializer.is_valid(raise_exception=True)
     user = serializer.validated_data['user']
 
-    refresh = RefreshToken.for_user(user)
+    refresh = RevocableRefreshToken.for_user(user)
     return Response({
         'user': {
             'id': user.id,
@@ -74,7 +84,7 @@ def login_view(request):
 def logout(request):
     try:
         refresh_token = request.data["refresh"]
-        token = RefreshToken(refresh_token)
+        token = RevocableRefreshToken(refresh_token)
         token.blacklist() 
         return Response({"message": "Logged out successfully."}, status=status.HTTP_205_RESET_CONTENT)
     except Exception as e:
@@ -86,7 +96,7 @@ def logout(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def me(request):
-    serializer = UserSerializer(request.user)
+    serializer = UserSerializer(request.user, **field_selection(request))
     return Response(serializer.data)
 
 # ! Forgot password
@@ -106,7 +116,8 @@ def password_reset_request(request):
     
     reset_link = f"https://omar-heady-paulina.ngrok-free.dev/reset-password/{uid}/{token}"
     
-    send_mail(
+    # Sent by `manage.py send_queued_mail` (blog/mail.py)
+    queue_mail(
         subject="Password Reset",
         message=f"Click the link to reset your password: {reset_link}",
         from_email=settings.DEFAULT_FROM_EMAIL,
@@ -148,64 +159,24 @@ def upload_profile_picture(request):
     user.save()
     return Response({'message': 'Profile picture updated successfully!', 'profile_picture': user.profile_picture.url})
 
+# ! Read-heavy GETs (blog/reads.py)
+# The GET branches of the four views below are `return reads.run(reads.X(...))`.
+# reads.X is the whole GET as a plain generator function, shared with the async
+# views (blog/async_views.py). Read it top to bottom as ordinary view code, with
+#   rows = yield Fetch(queryset)  ->  rows = list(queryset)
+#   n = yield Count(queryset)     ->  n = queryset.count()
+#   x = yield Call(func, *args)   ->  x = func(*args)
+# and its `return` as the view's Response. reads.run() performs each step with
+# the sync ORM and sends the result back; reads.arun() does the same with the
+# async ORM.
+
 # ! List all blogs / Create blog
 @api_view(['GET', 'POST'])
 @parser_classes([JSONParser,MultiPartParser, FormParser])
 def blogs_list_create(request):
+    # GET: shared with the async view (blog/reads.py)
     if request.method == 'GET':
-        if request.GET.get('mine') == 'true' and request.user.is_authenticated:
-            # Only blogs created by logged-in user
-            blogs = Blog.objects.filter(author=request.user, deleted_at__isnull=True)
-        else:
-            if request.user.is_authenticated:
-                blogs = Blog.objects.filter(
-                    deleted_at__isnull=True
-                ).filter(
-                    Q(is_published=True, publish_at__lte=timezone.now()) | 
-                    Q(author=request.user)
-                )
-            else:
-                blogs = Blog.objects.filter(
-                    deleted_at__isnull=True,
-                    is_published=True,
-                    publish_at__lte=timezone.now()
-                )
-
-        # Search by title
-        search_query = request.GET.get('search')
-        if search_query:
-            blogs = blogs.filter(title__icontains=search_query)
-
-        # Filter by category
-        category_name = request.GET.get('category')
-        if category_name:
-            blogs = blogs.filter(category__name__iexact=category_name)
-
-        # Sorting
-        sort_by = request.GET.get('sort', 'newest')
-        if sort_by == 'newest':
-            blogs = blogs.order_by('-publish_at')
-        elif sort_by == 'oldest':
-            blogs = blogs.order_by('publish_at')
-        elif sort_by == 'title_asc':
-            blogs = blogs.order_by('title')
-        elif sort_by == 'title_desc':
-            blogs = blogs.order_by('-title')
-
-        # Pagination
-        page_number = int(request.GET.get('page', 1))
-        page_size = int(request.GET.get('page_size', 10))
-        paginator = Paginator(blogs, page_size)
-        page_obj = paginator.get_page(page_number)
-
-        serializer = BlogSerializer(page_obj.object_list, many=True, context={'request': request})
-
-        return Response({
-            'total_pages': paginator.num_pages,
-            'current_page': page_obj.number,
-            'total_blogs': paginator.count,
-            'blogs': serializer.data
-        })
+        return reads.run(reads.blog_list(request))
 
     # POST: Create blog (authenticated)
     elif request.method == 'POST':
@@ -218,43 +189,37 @@ def blogs_list_create(request):
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
+# ! Batch create / update / delete blogs
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([JSONParser])
+def blogs_batch(request):
+    operations = request.data.get('operations') if isinstance(request.data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return Response({'detail': 'operations must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(operations) > settings.BLOG_BATCH_MAX_OPERATIONS:
+        return Response(
+            {'detail': f'At most {settings.BLOG_BATCH_MAX_OPERATIONS} operations per batch'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # All or nothing: a single invalid operation rejects the whole batch
+    results, applied = apply_blog_batch(request.user, operations)
+    return Response({'results': results}, status=status.HTTP_200_OK if applied else status.HTTP_400_BAD_REQUEST)
+
 # ! Get, Update, Delete single blog
 @api_view(['GET', 'PUT', 'DELETE'])
 @parser_classes([JSONParser,MultiPartParser, FormParser])
 def blog_detail(request, blog_id):
-    # Fetch the blog and ensure it is not soft-deleted
-    blog = get_object_or_404(Blog, id=blog_id, deleted_at__isnull=True)
-
-    # GET: Public can view if published
+    # GET: Public can view if published (blog/reads.py)
     if request.method == 'GET':
-        if not blog.is_published or (blog.publish_at and blog.publish_at > timezone.now()):
-            # Hide unpublished blog from public
-            if not (request.user.is_authenticated and (request.user == blog.author or request.user.is_admin)):
-                return Response({'detail': 'Blog not published yet'}, status=status.HTTP_403_FORBIDDEN)
-
-        # Count no. of times post get viewed   
-        stats, created = BlogStats.objects.get_or_create(blog=blog)
-
-        if not (request.user.is_authenticated and request.user == blog.author):
-            stats.views += 1
-            stats.save()
-
-        serializer = BlogSerializer(blog,context={'request': request})
-        data = serializer.data
+        return reads.run(reads.blog_detail(request, blog_id))
 
-        # Always include public stats
-        stats, _ = BlogStats.objects.get_or_create(blog=blog)
-        data['stats'] = {
-            "views": stats.views,
-            "likes": stats.likes,
-            "shares": stats.shares,
-            "comments": blog.comments.filter(deleted_at__isnull=True).count()
-        }
-
-        return Response(data)
+    # Fetch the blog and ensure it is not soft-deleted
+    blog = get_object_or_404(Blog, id=blog_id, deleted_at__isnull=True)
 
     # PUT: Only author or admin can update
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         if not request.user.is_authenticated or (request.user != blog.author and not request.user.is_admin):
             return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
@@ -276,11 +241,9 @@ def blog_detail(request, blog_id):
 # ! List all categories / Create category
 @api_view(['GET', 'POST'])
 def categories_list_create(request):
-    # GET: Public can view categories
+    # GET: Public can view categories (blog/reads.py)
     if request.method == 'GET':
-        categories = Category.objects.all()
-        serializer = CategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        return reads.run(reads.category_list(request))
 
     # POST: Only admin can create
     elif request.method == 'POST':
@@ -323,16 +286,13 @@ def category_detail(request, category_id):
 
 @api_view(['GET', 'POST'])
 def blog_comments(request, blog_id):
-    blog = get_object_or_404(Blog, id=blog_id, deleted_at__isnull=True)
-
-    # GET: list comments for this blog (exclude soft-deleted)
+    # GET: list comments for this blog (blog/reads.py)
     if request.method == 'GET':
-        comments = blog.comments.filter(deleted_at__isnull=True)
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        return reads.run(reads.blog_comments(request, blog_id))
 
     # POST: create a comment (authenticated)
     elif request.method == 'POST':
+        blog = get_object_or_404(Blog, id=blog_id, deleted_at__isnull=True)
         if not request.user.is_authenticated:
             return Response({'detail': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
         
@@ -365,27 +325,24 @@ def comment_detail(request, comment_id):
     else:
         return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
 
-# ! Likes   
-@api_view(['POST'])
+# ! Likes: POST likes, DELETE unlikes; repeating either is a no-op
+@api_view(['POST', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def blog_like(request, blog_id):
     blog = get_object_or_404(Blog, id=blog_id, deleted_at__isnull=True)
 
     # Prevent author from liking their own blog
-    if request.user == blog.author:
+    if request.method == 'POST' and request.user.id == blog.author_id:
         return Response({'detail': "Authors cannot like their own blog"}, status=403)
 
     stats, _ = BlogStats.objects.get_or_create(blog=blog)
+    if request.method == 'POST':
+        like_blog(stats, request.user)
+    else:
+        unlike_blog(stats, request.user)
 
-    
-    if stats.liked_users.filter(id=request.user.id).exists():
-        return Response({'detail': "You have already liked this blog."}, status=400)
-
-    stats.likes += 1
-    stats.liked_users.add(request.user)  
-    stats.save()
-
-    return Response({'likes': stats.likes, 'liked': True}, status=200)
+    stats.refresh_from_db(fields=['likes'])
+    return Response({'likes': counter_value(stats, blog.id, 'likes'), 'liked': request.method == 'POST'}, status=200)
 
 
 # ! Shares
@@ -394,10 +351,9 @@ def blog_like(request, blog_id):
 def blog_share(request, blog_id):
     blog = get_object_or_404(Blog, id=blog_id, deleted_at__isnull=True)
 
-    stats, _ = BlogStats.objects.get_or_create(blog=blog)
-    stats.shares += 1
-    stats.save()
-    return Response({'shares': stats.shares}, status=200)
+    increment_counter(blog.id, 'shares')
+    stats = BlogStats.objects.filter(blog=blog).first()
+    return Response({'shares': counter_value(stats, blog.id, 'shares')}, status=200)
 
 
 # ! Get stats of a blog
@@ -410,72 +366,115 @@ RANGE_CHOICES = {
     "yearly": TruncYear,
 }
 
-@api_view(['GET'])
-@permission_classes([IsAdminUser])
-def admin_stats(request):
-    range_type = request.GET.get("range", "monthly")
-    truncate_func = RANGE_CHOICES.get(range_type, TruncMonth)
-
-
-    total_views = BlogStats.objects.aggregate(total=Coalesce(Sum('views'), 0))['total']
-    total_likes = BlogStats.objects.aggregate(total=Coalesce(Sum('likes'), 0))['total']
-    total_shares = BlogStats.objects.aggregate(total=Coalesce(Sum('shares'), 0))['total']
-
-    total_users = User.objects.count()
-    total_blogs = Blog.objects.count()
-
-    
-    users_qs = (
-        User.objects.filter(date_joined__isnull=False)
-        .annotate(period=truncate_func('date_joined'))
+# Sum of one DailySiteStats column per period, skipping empty periods
+def rollup_by_range(field, truncate_func):
+    rows = (
+        DailySiteStats.objects.annotate(period=truncate_func('date'))
         .values('period')
-        .annotate(count=Count('id'))
+        .annotate(count=Sum(field))
+        .filter(count__gt=0)
         .order_by('period')
     )
-    users_by_range = [
-        {"period": u["period"].strftime("%Y-%m-%d"), "count": u["count"]}
-        for u in users_qs if u["period"] is not None
-    ]
-
-    # Blogs by range
-    blogs_qs = (
-        Blog.objects.filter(publish_at__isnull=False)
-        .annotate(period=truncate_func('publish_at'))
-        .values('period')
-        .annotate(count=Count('id'))
-        .order_by('period')
+    return [{"period": r["period"].strftime("%Y-%m-%d"), "count": r["count"]} for r in rows]
+
+# Every dashboard figure for one range; served through cached_admin_stats
+def compute_admin_stats(truncate_func):
+    # Every figure comes from the daily rollups (manage.py rollup_stats)
+    totals = DailySiteStats.objects.aggregate(
+        total_users=Coalesce(Sum('signups'), 0),
+        total_blogs=Coalesce(Sum('blogs_created'), 0),
+        total_views=Coalesce(Sum('views'), 0),
+        total_likes=Coalesce(Sum('likes'), 0),
+        total_shares=Coalesce(Sum('shares'), 0),
     )
-    blogs_by_range = [
-        {"period": b["period"].strftime("%Y-%m-%d"), "count": b["count"]}
-        for b in blogs_qs if b["period"] is not None
-    ]
+
+    users_by_range = rollup_by_range('signups', truncate_func)
+    blogs_by_range = rollup_by_range('publications', truncate_func)
 
     # Category stats (use Coalesce in annotation)
     category_stats = Category.objects.annotate(
-        total_likes=Coalesce(Sum('blogs__stats__likes'), 0),
-        total_shares=Coalesce(Sum('blogs__stats__shares'), 0),
-        total_views=Coalesce(Sum('blogs__stats__views'), 0),
+        total_likes=Coalesce(Sum('daily_stats__likes'), 0),
+        total_shares=Coalesce(Sum('daily_stats__shares'), 0),
+        total_views=Coalesce(Sum('daily_stats__views'), 0),
     ).values('name', 'total_likes', 'total_shares', 'total_views')
 
-    # Top 5 Blogs by views
-    blog_stats_qs = Blog.objects.annotate(
-    likes_sum=Coalesce(Sum('stats__likes'), 0),
-    shares_sum=Coalesce(Sum('stats__shares'), 0),
-    views_sum=Coalesce(Sum('stats__views'), 0),
-).order_by('-views_sum')[:5].values('title', 'likes_sum', 'shares_sum', 'views_sum')
-
-    data = {
-        "total_users": total_users,
-        "total_blogs": total_blogs,
-        "total_views": total_views,
-        "total_likes": total_likes,
-        "total_shares": total_shares,
+    # Top 5 Blogs by views (stats_views_idx)
+    blog_stats_qs = BlogStats.objects.order_by('-views').values(
+        title=F('blog__title'), likes_sum=F('likes'), shares_sum=F('shares'), views_sum=F('views'),
+    )[:5]
+
+    return {
+        **totals,
         "users_by_range": users_by_range,
         "blogs_by_range": blogs_by_range,
         "category_stats": list(category_stats),
         "blog_stats": list(blog_stats_qs),
+        "next_scheduled_publish": next_publish_due(),
     }
 
-    return Response(data)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_stats(request):
+    range_type = request.GET.get("range", "monthly")
+    if range_type not in RANGE_CHOICES:
+        range_type = "monthly"
+    truncate_func = RANGE_CHOICES[range_type]
+
+    data, age = cached_admin_stats(range_type, lambda: compute_admin_stats(truncate_func))
+    response = Response({
+        **data,
+        "blog_list_cache": blog_list_cache_stats(),
+        # Seconds since the figures were computed
+        "data_age": round(age, 1),
+    })
+    response['Age'] = str(int(age))
+    return response
+
+
+
+
+# ! Streaming stats export (blog/export.py)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def stats_export(request, dataset, fmt):
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        return Response({'detail': 'Unknown export'}, status=status.HTTP_404_NOT_FOUND)
+    range_type = request.GET.get("range", "monthly")
+    if range_type not in RANGE_CHOICES:
+        range_type = "monthly"
+
+    columns, rows = EXPORT_DATASETS[dataset]
+    content_type, lines = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(lines(columns, rows(RANGE_CHOICES[range_type])), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{dataset}-{range_type}.{fmt}"'
+    return response
 
 
+# ! Engagement history of a blog
+# ?range= as for admin_stats, optional ?since= / ?until= dates (until exclusive).
+# History older than the compaction windows is only kept per day / per month.
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def blog_engagement(request, blog_id):
+    blog = get_object_or_404(Blog.objects.visible_to(request.user), id=blog_id)
+    range_type = request.GET.get("range", "daily")
+    truncate_func = RANGE_CHOICES.get(range_type, TruncDay)
+
+    bounds = {}
+    for name in ('since', 'until'):
+        value = request.GET.get(name)
+        if not value:
+            continue
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            return Response({'detail': f'Invalid {name} date'}, status=status.HTTP_400_BAD_REQUEST)
+        bounds[name] = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+    return Response({
+        'blog': blog.id,
+        'range': range_type if range_type in RANGE_CHOICES else 'daily',
+        'series': engagement_series(blog.id, truncate_func, **bounds),
+    })
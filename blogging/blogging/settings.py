@@ -56,17 +56,28 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'blog.authentication.CachedJWTAuthentication',
     ),
 }
 
+# Users behind JWTs are cached this many seconds (blog/authentication.py)
+JWT_USER_CACHE_ALIAS = 'default'
+JWT_USER_CACHE_TIMEOUT = int(os.getenv('JWT_USER_CACHE_TIMEOUT', 300))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'blog.serializers.RevocableTokenRefreshSerializer',
 }
 
+# In-process Bloom filter of revoked refresh tokens (blog/revocation.py)
+TOKEN_REVOCATION_SYNC_INTERVAL = int(os.getenv('TOKEN_REVOCATION_SYNC_INTERVAL', 5))
+TOKEN_REVOCATION_REBUILD_INTERVAL = 600
+TOKEN_REVOCATION_ERROR_RATE = 0.01
+TOKEN_REVOCATION_MIN_CAPACITY = 10_000
+
 CORS_ALLOWED_ORIGINS = [
     "http://192.168.1.100:3000",
     "http://localhost:3000",
@@ -130,6 +141,59 @@ DATABASES = {
     }
 }
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (file-based, Redis, memcached) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'blogging'),
+    }
+}
+
+# Anonymous GET /api/blogs/ responses (blog/cache.py)
+BLOG_LIST_CACHE_ALIAS = 'default'
+BLOG_LIST_CACHE_TIMEOUT = int(os.getenv('BLOG_LIST_CACHE_TIMEOUT', 60))
+
+# GET /api/stats/ per range (blog/cache.py): fresh for TIMEOUT seconds, then
+# served stale for up to STALE more seconds while one request recomputes; on a
+# cold cache other requests wait up to WAIT seconds for that recompute
+ADMIN_STATS_CACHE_TIMEOUT = int(os.getenv('ADMIN_STATS_CACHE_TIMEOUT', 60))
+ADMIN_STATS_CACHE_STALE = int(os.getenv('ADMIN_STATS_CACHE_STALE', 600))
+ADMIN_STATS_CACHE_LOCK_TIMEOUT = 30
+ADMIN_STATS_CACHE_WAIT = float(os.getenv('ADMIN_STATS_CACHE_WAIT', 2))
+
+# Ids per keyset chunk of GET /api/stats/export/ (blog/export.py)
+STATS_EXPORT_CHUNK_SIZE = 2000
+
+# Ranking scores for sort=popular / sort=trending (blog/scores.py)
+BLOG_SCORE_WEIGHTS = {'views': 1, 'likes': 3, 'comments': 4, 'shares': 5}
+BLOG_TRENDING_GRAVITY = 1.8
+
+# Detail view counts are buffered in memory and written back at most this
+# often, in seconds (blog/counters.py). 0 writes every view straight through.
+BLOG_VIEW_FLUSH_INTERVAL = int(os.getenv('BLOG_VIEW_FLUSH_INTERVAL', 5))
+
+# Spread view/like/share increments over this many BlogStatsShard rows per blog
+# (blog/counters.py); 0 or 1 writes straight to BlogStats. Fold the shards back
+# with `manage.py compact_counter_shards`, also after turning this off.
+BLOG_COUNTER_SHARDS = int(os.getenv('BLOG_COUNTER_SHARDS', 0))
+
+# Engagement history (blog/engagement.py): hourly buckets are kept this many
+# days, daily buckets this many days, monthly buckets forever
+BLOG_ENGAGEMENT_HOURLY_DAYS = 2
+BLOG_ENGAGEMENT_DAILY_DAYS = 90
+
+# Newest live comments embedded in GET /api/blogs/<id>/
+BLOG_DETAIL_COMMENT_LIMIT = 20
+
+# Serve the blog list/detail, comments and categories GETs with the async
+# views in blog/async_views.py; only worth it under ASGI (blogging/asgi.py)
+BLOG_ASYNC_VIEWS = os.getenv('BLOG_ASYNC_VIEWS', 'False') == 'True'
+
+# POST /api/blogs/batch/ (blog/batch.py)
+BLOG_BATCH_MAX_OPERATIONS = 100
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -148,6 +212,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Login resolves username or email in one query and hashes once (blog/backends.py)
+AUTHENTICATION_BACKENDS = ['blog.backends.UsernameOrEmailBackend']
+
+# PBKDF2 work factor; stored hashes are only ever re-encoded upwards. Values
+# below blog.hashers.MIN_ITERATIONS need PASSWORD_HASH_ALLOW_WEAK (load tests
+# only) and are refused otherwise (blog/hashers.py)
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', 1_000_000))
+PASSWORD_HASH_ALLOW_WEAK = os.getenv('PASSWORD_HASH_ALLOW_WEAK', 'False') == 'True'
+PASSWORD_HASHERS = [
+    'blog.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -184,3 +264,8 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'Blogging Platform <noreply@blog.com>')
 
+# Outbound mail queue (blog/mail.py, `manage.py send_queued_mail`)
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+MAIL_QUEUE_RETRY_DELAY = 60
+MAIL_QUEUE_LEASE = 300
+